@@ -0,0 +1,562 @@
+import os
+import sys
+import math
+import random
+import time
+import tempfile
+import threading
+import tracemalloc
+from typing import Callable
+from util import Vec2, RingBuffer
+from event import Event, EventLog, EventType, MousePosition, MouseClick, events, render
+from simplify import simplify
+from spill import SpillWriter, SpillReader
+from record import Recorder
+from script import Script
+from binary import BinaryScript
+from catalog import ScriptCatalog
+from lang import Engine
+from lang.params import EngineParameters
+from lang.lexer import Lexer
+from lang.parser import Parser
+from lang.node import ProgramNode
+from lang.interpreter import Interpreter
+from lang.environment import Environment
+from lang.builtins import add_builtins
+from lang.compiler import Compiler
+from lang.cache import ProgramCache
+from lang.optimizer import Optimizer
+from lang.printer import Printer
+from lang.recording import Recording
+from lang.clock import FrameClock, OverrunPolicy, VirtualClock
+from lang.backend import InputBackend, RecordingBackend, BACKENDS, create_backend
+
+
+def _parse(lines: list[str]) -> ProgramNode:
+    """Parses the lines of code into the abstract syntax tree (AST)."""
+    return Parser(Lexer(lines).tokenize()).parse()
+
+
+def _timed(func: Callable[[], None]) -> float:
+    """Amount of seconds taken to call the function."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench_compiler(frames: int = 20000) -> None:
+    """Compares the tree walking interpreter to the compiled program on `->` heavy frames."""
+    lines = ["x: int = 1", "-> y: int = 2", "func add(a: int, b: int) {", "print(a + b)", "}"]
+    for _ in range(frames):
+        lines.append("x: int = x - y + 1")
+        lines.append("-> y: int = (x - y) + 2 - x")
+        lines.append("-> z: bool = x + 1.5")
+    ast = _parse(lines)
+
+    interpreter = Interpreter()
+
+    def tree_walk() -> None:
+        for statement in ast.statements:
+            interpreter.interpret(statement)
+
+    program = Compiler().compile_program(ast)
+    environment = Environment()
+    add_builtins(environment)
+
+    def compiled() -> None:
+        for code in program:
+            code(environment)
+
+    walk_time = _timed(tree_walk)
+    compiled_time = _timed(compiled)
+    print(f"tree walker: {walk_time * 1e6 / frames:.2f} us/frame")
+    print(f"compiled:    {compiled_time * 1e6 / frames:.2f} us/frame")
+    print(f"speedup:     {walk_time / compiled_time:.2f}x")
+
+
+def _recording(lines: int) -> list[str]:
+    """Creates the lines of a recorded script, with pairs of moves on the same frame."""
+    recorded: list[str] = []
+    for i in range(lines):
+        prefix = "-> " if i % 2 else ""
+        recorded.append(f"{prefix}mpos({i % 1920}, {i % 1080})")
+    return recorded
+
+
+def bench_literals(lines: int = 100000) -> None:
+    """Evaluates every argument of the calls in a recorded script."""
+    ast = _parse(_recording(lines))
+    args = [arg for statement in ast.statements for call in statement.statements for arg in call.args]
+
+    interpreter = Interpreter()
+
+    def tree_walk() -> None:
+        for arg in args:
+            interpreter.interpret(arg)
+
+    compiler = Compiler()
+    compiled_args = [compiler.compile(arg) for arg in args]
+    environment = Environment()
+
+    def compiled() -> None:
+        for arg in compiled_args:
+            arg(environment)
+
+    print(f"tree walker: {_timed(tree_walk) * 1e9 / len(args):.1f} ns/literal")
+    print(f"compiled:    {_timed(compiled) * 1e9 / len(args):.1f} ns/literal")
+
+
+def bench_clock(fps: int = 1000, seconds: float = 2.0) -> None:
+    """Measures how closely each overrun policy keeps to the frame deadlines."""
+    frames = int(fps * seconds)
+    for policy in OverrunPolicy:
+        clock = FrameClock(fps, policy)
+        clock.start()
+        start = time.perf_counter()
+        for _ in range(frames):
+            clock.tick()
+        drift = (time.perf_counter() - start) - seconds
+        print(f"{policy.value:>9}: drift={drift * 1e3:.3f}ms {clock.stats}")
+
+
+def bench_backends(calls: int = 2000) -> None:
+    """Measures the latency of input actions, sent one at a time or batched, for every available backend."""
+    backends: dict[str, InputBackend] = {"recording": RecordingBackend(VirtualClock(1))}
+    for name in BACKENDS:
+        try:
+            backends[name] = create_backend(name)
+        except Exception as e:
+            print(f"{name:>10}: unavailable ({e})")
+
+    for name, backend in backends.items():
+        x, y = backend.position()
+        start = time.perf_counter()
+        for i in range(calls):
+            backend.flush([("move", x + i % 2, y)])
+        single_time = (time.perf_counter() - start) / calls
+
+        # Same amount of actions, flushed as batches of a frame with 8 actions.
+        batch = [("move", x + i % 2, y) for i in range(8)]
+        start = time.perf_counter()
+        for _ in range(calls // len(batch)):
+            backend.flush(batch)
+        batch_time = (time.perf_counter() - start) / (calls // len(batch) * len(batch))
+        print(f"{name:>10}: single={single_time * 1e6:.1f} us/action batched={batch_time * 1e6:.1f} us/action")
+
+
+def bench_streaming(lines: int = 50000) -> None:
+    """Measures the time to the first frame and peak memory of a long recording,
+    parsed up front compared to streamed as it plays.
+    """
+    recording = _recording(lines)
+    for streaming in (False, True):
+        params = EngineParameters(100, (0, 0), 0.0, headless=True, streaming=streaming)
+        tracemalloc.start()
+        start = time.perf_counter()
+        engine = Engine(iter(recording), params)
+        engine.next()
+        first_frame = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"streaming={streaming!s:>5}: first frame={first_frame * 1e3:.1f}ms peak={peak / 2 ** 20:.1f}MiB")
+
+
+def bench_cache(lines: int = 20000) -> None:
+    """Compares loading a recording that is not cached to one that is."""
+    recording = _recording(lines)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ProgramCache(directory)
+        for _ in range(2):
+            cache.load("bench.mx3", recording)
+            start = "warm" if cache.last_hit else "cold"
+            print(f"{start}: {cache.last_load_ns / 1e6:.1f}ms")
+
+
+def bench_memory(lines: int = 50000) -> None:
+    """Measures the memory held by the parsed program of a recording."""
+    recording = _recording(lines)
+    tracemalloc.start()
+    program = _parse(recording)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{size / len(program.statements):.0f} bytes/statement ({size / 2 ** 20:.1f}MiB total)")
+
+
+def bench_calls(frames: int = 20000) -> None:
+    """Measures the overhead of calling user-defined functions, either a single helper
+    called every frame or a chain of nested helpers.
+    """
+    scripts = {
+        "looped": ["func helper(x: int) {", "mpos(x, x)", "}"],
+        "nested": ["func inner(x: int) {", "mpos(x, x)", "}",
+                   "func middle(x: int) {", "inner(x + 1)", "}",
+                   "func outer(x: int) {", "middle(x + 1)", "}"],
+    }
+    calls = {"looped": "helper", "nested": "outer"}
+    for name, lines in scripts.items():
+        lines = lines + [f"{calls[name]}({i % 100})" for i in range(frames)]
+        engine = Engine(lines, EngineParameters(100, (0, 0), 0.0, headless=True))
+        print(f"{name:>6}: {_timed(engine.run) * 1e6 / frames:.2f} us/frame")
+
+
+def bench_recording(lines: int = 100000) -> None:
+    """Compares loading and playing a recording as a parsed program to playing its packed events."""
+    recording = _recording(lines)
+    params = EngineParameters(100, (0, 0), 0.0, headless=True)
+    loaders = {
+        "program": lambda: Engine(_parse(recording), params),
+        "events": lambda: Engine(Recording.parse(recording), params),
+    }
+    for name, load in loaders.items():
+        start = time.perf_counter()
+        engine = load()
+        load_time = time.perf_counter() - start
+        play_time = _timed(engine.run)
+        frames = engine.clock.now_ns() // engine.clock.period_ns
+        print(f"{name:>7}: load={load_time * 1e9 / lines:.0f} ns/line play={play_time * 1e9 / frames:.0f} ns/frame")
+
+
+def bench_recorder(frames: int = 200000) -> None:
+    """Compares capturing the events of a recording as formatted strings to the event log."""
+    positions = [(i % 1920, i // 7 % 1080) for i in range(frames)]
+    period_ns = 10_000_000
+
+    def strings() -> list[str]:
+        actions: list[str] = []
+        for frame, position in enumerate(positions):
+            events: list[Event] = [MousePosition(Vec2(position))]
+            if frame % 50 == 0:
+                events.append(MouseClick("left", False))
+            actions.append(str.join("\n\t-> ", [str(event) for event in events]))
+        return actions
+
+    def event_log() -> EventLog:
+        log = EventLog()
+        for frame, (x, y) in enumerate(positions):
+            log.append(frame * period_ns, EventType.MPOS, x, y)
+            if frame % 50 == 0:
+                log.append(frame * period_ns, EventType.MCLICK, button=0)
+        return log
+
+    events = frames + frames // 50
+    for name, capture in (("strings", strings), ("log", event_log)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        captured = capture()
+        capture_time = time.perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>7}: {capture_time * 1e9 / frames:.0f} ns/frame {size / events:.1f} bytes/event")
+        del captured
+
+    log = event_log()
+    print(f" render: {_timed(lambda: log.render(False, period_ns)) * 1e9 / events:.0f} ns/event (on save)")
+
+
+def bench_capture(rate: int = 10000, seconds: float = 1.0, fps: int = 100) -> None:
+    """Pushes a burst of events from a listener thread into the capture queue while
+    the frames drain it, counting any events that are dropped.
+    """
+    for name, interval in (("paced", 1 / rate), ("unpaced", 0.0)):
+        queue = RingBuffer(65536)
+        total = int(rate * seconds) if interval else 500000
+        done = threading.Event()
+
+        def listener() -> None:
+            start = time.perf_counter()
+            for i in range(total):
+                queue.push((time.perf_counter_ns(), EventType.MPOS, i, i, 0))
+                # Spins until the time of the next event, sleeping is too coarse for the rate.
+                while interval and time.perf_counter() - start < (i + 1) * interval:
+                    pass
+            done.set()
+
+        received = 0
+        thread = threading.Thread(target=listener)
+        thread.start()
+        while not done.is_set():
+            time.sleep(1 / fps)
+            received += len(queue.drain())
+        thread.join()
+        received += len(queue.drain())
+        print(f"{name:>7}: pushed={total} received={received} overflows={queue.overflows} high_water={queue.high_water}")
+
+
+def bench_deadlines(seconds: float = 2.0, disk_latency: float = 0.02, rate: int = 2000) -> None:
+    """Records at high rates with the recorder, fed by a listener that moves the mouse at the
+    rate instead of a device, counting the frames that missed their deadline. The events
+    are spilled and synced once a second, on a disk that takes the latency to sync.
+    """
+    class Listener(threading.Thread):
+        def __init__(self, recorder: Recorder) -> None:
+            super().__init__(daemon=True)
+            self.recorder = recorder
+            self.stopped = threading.Event()
+
+        def run(self) -> None:
+            i = 0
+            while not self.stopped.wait(1 / rate):
+                self.recorder.on_move(i % 1920, i // 1920 % 1080)
+                i += 1
+
+        def stop(self) -> None:
+            self.stopped.set()
+
+    class BenchRecorder(Recorder):
+        def position(self) -> tuple[int, int]:
+            return 0, 0
+
+        def listen(self) -> Listener:
+            listener = Listener(self)
+            listener.start()
+            return listener
+
+    with tempfile.TemporaryDirectory() as directory:
+        for fps in (500, 1000):
+            recorder = BenchRecorder(fps, False, f"{directory}/{fps}.rec")
+            sync = recorder.spill.sync
+
+            def slow_sync() -> None:
+                sync()
+                time.sleep(disk_latency)
+
+            recorder.spill.sync = slow_sync
+            for _ in range(int(fps * seconds)):
+                recorder.next()
+            recorder.stop()
+            print(f"{fps:>4} fps: {recorder.stats} high_water={recorder.high_water} overflows={recorder.overflows}")
+
+
+def bench_loading(megabytes: int = 20) -> None:
+    """Loads a large recorded script, comparing the settings alone with the code held in
+    memory and the code streamed from the file.
+    """
+    line = "mpos(1234, 567)"
+    with tempfile.TemporaryDirectory() as directory:
+        script = Script(f"{directory}/large.mx3")
+        script.save_script(line for _ in range(megabytes * 1024 * 1024 // (len(line) + 1)))
+
+        start = time.perf_counter()
+        script = Script.load_script(script.filename)
+        settings_time = time.perf_counter() - start
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        lines = sum(1 for _ in script.lines())
+        stream_time = time.perf_counter() - start
+        _, stream_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        script.code
+        load_time = time.perf_counter() - start
+        load_size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"{megabytes} MB, {lines} lines")
+    print(f"settings: {settings_time * 1e3:.2f} ms")
+    print(f"  stream: {stream_time * 1e3:.0f} ms peak={stream_peak / 1024:.0f} KiB")
+    print(f"    load: {load_time * 1e3:.0f} ms size={load_size / 1024 / 1024:.0f} MiB")
+
+
+def bench_binary(frames: int = 500_000) -> None:
+    """Compares the size and load time of a recording saved as text and as its binary
+    companion, up to the point where it can be played.
+    """
+    rng = random.Random(0)
+    log = EventLog()
+    for frame in range(frames):
+        log.append(frame * 10_000_000, EventType.MPOS, rng.randint(0, 1919), rng.randint(0, 1079))
+        if frame % 50 == 0:
+            log.append(frame * 10_000_000, EventType.MCLICK, button=0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        script = Script(f"{directory}/large.mx3")
+        script.code = log.render(False, 10_000_000)
+        script.save_script()
+        binary = BinaryScript.from_script(script)
+        binary.save(f"{script.filename}b")
+
+        start = time.perf_counter()
+        Script.load_script(script.filename).code
+        text_time = time.perf_counter() - start
+        start = time.perf_counter()
+        Recording.parse(Script.load_script(script.filename).lines())
+        parse_time = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = BinaryScript.load(f"{script.filename}b")
+        binary_time = time.perf_counter() - start
+        loaded.close()
+
+        text_size = os.path.getsize(script.filename)
+        binary_size = os.path.getsize(f"{script.filename}b")
+
+    print(f"events={len(binary.recording)} text={text_size / 1024 / 1024:.1f} MiB "
+          f"binary={binary_size / 1024 / 1024:.1f} MiB ({text_size / binary_size:.1f}x smaller)")
+    print(f"  text: {text_time * 1e3:.0f} ms to load the lines, {parse_time * 1e3:.0f} ms to a recording")
+    print(f"binary: {binary_time * 1e3:.2f} ms to a recording")
+
+
+def bench_catalog(scripts: int = 300) -> None:
+    """Indexes a directory of recorded scripts, then measures the refreshes that find
+    nothing changed and one script changed, along with reading the settings of every script.
+    The time until the scripts are listed, before any are indexed, is measured first.
+    """
+    lines = [f"mpos({i}, {i})" for i in range(2000)]
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(scripts):
+            script = Script(os.path.join(directory, f"script{i}.mx3"))
+            script.code = lines
+            script.save_script()
+
+        catalog = ScriptCatalog(directory)
+        listed = _timed(catalog.scan)
+        cold = _timed(catalog.refresh)
+        warm = _timed(catalog.refresh)
+        script.config.general.fps = 60
+        script.save_script()
+        changed = _timed(catalog.refresh)
+
+        start = time.perf_counter()
+        reloaded = ScriptCatalog(directory)
+        for name in reloaded.names():
+            reloaded.entry(name).settings
+        indexed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name in reloaded.names():
+            Script.load_script(os.path.join(directory, name))
+        opened = time.perf_counter() - start
+
+    print(f"scripts={scripts} listed={listed * 1e3:.1f} ms cold={cold * 1e3:.0f} ms unchanged={warm * 1e3:.1f} ms one_changed={changed * 1e3:.1f} ms")
+    print(f"settings: {indexed * 1e3:.1f} ms from the index, {opened * 1e3:.1f} ms opening every script")
+
+
+def bench_spill(minutes: int = 10, fps: int = 100) -> None:
+    """Spills a long recording to disk once a second, as the recorder does, measuring the
+    memory used while capturing and while saving from the spill file.
+    """
+    period_ns = 1_000_000_000 // fps
+    frames = minutes * 60 * fps
+    with tempfile.TemporaryDirectory() as directory:
+        writer = SpillWriter(f"{directory}/script.mx3.rec", 0, period_ns)
+        log = EventLog()
+        tracemalloc.start()
+        start = time.perf_counter()
+        for frame in range(frames):
+            log.append(frame * period_ns, EventType.MPOS, frame % 1920, frame // 7 % 1080)
+            if frame % fps == fps - 1:
+                writer.write(log)
+                writer.sync()
+        writer.close()
+        capture_time = time.perf_counter() - start
+        _, capture_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        reader = SpillReader(writer.filename)
+        tracemalloc.start()
+        start = time.perf_counter()
+        lines = sum(1 for _ in render(events(reader.records(), False, reader.period_ns, reader.start_ns)))
+        render_time = time.perf_counter() - start
+        _, render_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"events={frames} spill: {capture_time * 1e9 / frames:.0f} ns/event peak={capture_peak / 1024:.0f} KiB")
+    print(f"lines={lines} render: {render_time * 1e9 / frames:.0f} ns/event peak={render_peak / 1024:.0f} KiB (on save)")
+
+
+def bench_simplify(frames: int = 6000) -> None:
+    """Simplifies a recorded trail of curved movements at multiple tolerances."""
+    rng = random.Random(0)
+    events: list[tuple[int, Event]] = []
+    for frame in range(frames):
+        # Strokes of one second that curve, with a pixel of noise from the device.
+        x = 960 + int(400 * math.sin(frame / 40)) + rng.randint(-1, 1)
+        y = 540 + int(300 * math.cos(frame / 55)) + rng.randint(-1, 1)
+        events.append((frame, MousePosition(Vec2((x, y)))))
+        if frame % 100 == 99:
+            events.append((frame, MouseClick("left", False)))
+
+    for tolerance in (1.0, 2.0, 5.0):
+        start = time.perf_counter()
+        _, report = simplify(events, tolerance)
+        print(f"tolerance={tolerance}px: {report} time={(time.perf_counter() - start) * 1e3:.0f}ms")
+
+
+def _optimizer_corpus() -> dict[str, list[str]]:
+    """Scripts the optimizer is measured on, a recording with pauses and a hand-written script."""
+    rng = random.Random(0)
+    log = EventLog()
+    timestamp = 0
+    for _ in range(2000):
+        # Movements with pauses in between them, and the occasional click.
+        timestamp += rng.choice([10, 10, 10, 30, 200]) * 1_000_000
+        log.append(timestamp, EventType.MPOS, rng.randint(0, 1919), rng.randint(0, 1079))
+        if rng.random() < 0.05:
+            log.append(timestamp, EventType.MDOWN, button=0)
+            log.append(timestamp + 1, EventType.MUP, button=0)
+
+    handwritten = ["speed: int = 2 + 8", "func tap(x: int, y: int) {", "mpos(x, y)", 'mclick("left", false)', "}"]
+    for i in range(500):
+        handwritten += ["mpos(100, 200)", "wait(speed)", "wait(3)", "mpos(100, 200)", f"tap({i % 7} + 10, 20 - 5)",
+                        "mpos(400 + 20, 300)", "wait(1)", "wait(1)", 'mclick("left", false)', "mpos(420, 300)"]
+
+    return {"recording": log.render(False, 10_000_000), "handwritten": handwritten}
+
+
+def bench_optimizer() -> None:
+    """Measures the statements and calls removed by the optimizer from the corpus, checking
+    the scripts still take the same amount of frames.
+    """
+    for name, lines in _optimizer_corpus().items():
+        optimizer = Optimizer()
+        optimized = Printer().print_program(optimizer.optimize(_parse(lines)))
+
+        durations = []
+        for code in (lines, optimized):
+            params = EngineParameters(100, (0, 0), 0.0, headless=True, optimize=False)
+            engine = Engine(_parse(code), params)
+            engine.run()
+            durations.append(engine.clock.now_ns() // engine.clock.period_ns)
+        print(f"{name:>11}: {optimizer.report} lines={len(lines)}->{len(optimized)} "
+              f"frames={durations[0]}->{durations[1]}")
+
+
+# Maps the benchmark names to the functions that run them.
+BENCHMARKS: dict[str, Callable[[], None]] = {
+    "compiler": bench_compiler,
+    "literals": bench_literals,
+    "clock": bench_clock,
+    "backends": bench_backends,
+    "streaming": bench_streaming,
+    "cache": bench_cache,
+    "memory": bench_memory,
+    "calls": bench_calls,
+    "recording": bench_recording,
+    "recorder": bench_recorder,
+    "capture": bench_capture,
+    "spill": bench_spill,
+    "deadlines": bench_deadlines,
+    "loading": bench_loading,
+    "binary": bench_binary,
+    "catalog": bench_catalog,
+    "simplify": bench_simplify,
+    "optimizer": bench_optimizer,
+}
+
+
+def main():
+    """Runs the benchmarks named on the command line, or all of them."""
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: '{name}'. Valid options are {', '.join(BENCHMARKS)}.")
+            sys.exit(1)
+
+        print(f"[{name}]")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main()
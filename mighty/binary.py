@@ -0,0 +1,219 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Optional
+from script import Script, ScriptConfig
+from lang.recording import Recording
+
+
+class BinaryScript:
+    """Binary companion of a script, holding its settings along with either the packed
+    event table of a recording, or the code of any other script. Every section begins
+    on an aligned offset and the columns are fixed-width little-endian integers, so a
+    loaded recording plays straight from the mapped file.
+
+    Layout: header, settings as JSON, then the frames, xs, ys, args, and opcodes columns
+    of a recording, or the code as UTF-8 text. Each column is stored with the narrowest
+    type its values fit in, which is recorded in the header. The header also holds the
+    size and modification time of the text script, to tell if it changed since.
+    """
+    MAGIC: bytes = b"MX3B"
+    VERSION: int = 1
+    # Magic, version, kind, events, frames of the recording, settings size, body size,
+    # size and modification time of the script, column types.
+    HEADER: struct.Struct = struct.Struct("<4sHHQQQQQq5s")
+    ALIGNMENT: int = 8
+    # Types a column can be stored as, from narrowest to widest.
+    SIGNED: tuple[str, ...] = ('b', 'h', 'i')
+    UNSIGNED: tuple[str, ...] = ('B', 'H', 'I')
+
+    # Kinds of body the file holds.
+    RECORDING: int = 0
+    CODE: int = 1
+
+    def __init__(self, config: ScriptConfig, recording: Optional[Recording] = None,
+                 code: Optional[list[str]] = None) -> None:
+        self.config: ScriptConfig = config
+        self.recording: Optional[Recording] = recording
+        self.code: Optional[list[str]] = code  # Only set when the script is not a recording.
+        # Size and modification time of the text script the binary script was made from.
+        self.source_size: int = 0
+        self.source_mtime_ns: int = 0
+
+        # Mapped file and the views of it held by the recording, when loaded.
+        self.mapping: Optional[mmap.mmap] = None
+        self.views: list[memoryview] = []
+
+    def close(self) -> None:
+        """Unmaps the file the recording was loaded from, the recording cannot be played afterwards."""
+        if self.mapping is None:
+            return
+
+        self.recording = None
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.mapping.close()
+        self.mapping = None
+
+    @staticmethod
+    def from_script(script: Script) -> 'BinaryScript':
+        """Packs the saved script, as a recording if it is made only of literal events."""
+        recording = Recording.parse(script.lines())
+        if recording is not None:
+            binary = BinaryScript(script.config, recording=recording)
+        else:
+            binary = BinaryScript(script.config, code=list(script.lines()))
+        stat = os.stat(script.filename)
+        binary.source_size, binary.source_mtime_ns = stat.st_size, stat.st_mtime_ns
+        return binary
+
+    def made_from(self, filename: str) -> bool:
+        """Checks if the binary script was made from the text script as it is now."""
+        stat = os.stat(filename)
+        return (self.source_size, self.source_mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+    def to_script(self, filename: str) -> Script:
+        """Unpacks the settings and code into a text script, which is not saved."""
+        script = Script(filename)
+        script.config.from_dict(self.config.to_dict())
+        script.code = list(self.recording.lines()) if self.recording is not None else list(self.code)
+        return script
+
+    @staticmethod
+    def _columns(recording: Recording) -> tuple:
+        """Columns of a recording in the order they are stored, widest first to stay aligned."""
+        return recording.frames, recording.xs, recording.ys, recording.args, recording.opcodes
+
+    @staticmethod
+    def _narrow(column: array) -> array:
+        """Converts the column into the narrowest type that holds all of its values."""
+        if len(column) == 0:
+            return column
+        low, high = min(column), max(column)
+        for typecode in BinaryScript.SIGNED if column.typecode.islower() else BinaryScript.UNSIGNED:
+            limit = 1 << (array(typecode).itemsize * 8 - typecode.islower())
+            if low >= (-limit if typecode.islower() else 0) and high < limit:
+                return column if typecode == column.typecode else array(typecode, column)
+        return column
+
+    @staticmethod
+    def _padding(size: int) -> bytes:
+        """Bytes needed after a section of the size for the next one to be aligned."""
+        return bytes(-size % BinaryScript.ALIGNMENT)
+
+    def save(self, filename: str) -> None:
+        """Writes the file under a temporary name and renames it over the file."""
+        settings = json.dumps(self.config.to_dict()).encode()
+        if self.recording is not None:
+            kind, events, length = BinaryScript.RECORDING, len(self.recording), self.recording.length
+            columns = [BinaryScript._narrow(array(column.typecode, column))
+                       for column in BinaryScript._columns(self.recording)]
+            typecodes = "".join(column.typecode for column in columns).encode()
+            sections = []
+            for column in columns:
+                if sys.byteorder == "big" and column.itemsize > 1:
+                    column.byteswap()
+                sections.append(column.tobytes())
+        else:
+            kind, events, length, typecodes = BinaryScript.CODE, 0, 0, b""
+            sections = ["".join(f"{line}\n" for line in self.code).encode()]
+
+        body_size = sum(len(section) + len(BinaryScript._padding(len(section))) for section in sections)
+        temporary = f"{filename}.tmp"
+        with open(temporary, 'wb') as file:
+            file.write(BinaryScript.HEADER.pack(BinaryScript.MAGIC, BinaryScript.VERSION, kind, events, length,
+                                                len(settings), body_size, self.source_size,
+                                                self.source_mtime_ns, typecodes))
+            file.write(BinaryScript._padding(BinaryScript.HEADER.size))
+            file.write(settings)
+            file.write(BinaryScript._padding(len(settings)))
+            for section in sections:
+                file.write(section)
+                file.write(BinaryScript._padding(len(section)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, filename)
+
+    @staticmethod
+    def load(filename: str) -> 'BinaryScript':
+        """Maps the file into memory. The columns of a recording are views of the mapped
+        file, which stays open until the binary script is closed.
+        """
+        with open(filename, 'rb') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        binary = None
+        data = memoryview(mapping)
+        try:
+            binary = BinaryScript._unpack(filename, data)
+        finally:
+            if binary is None or binary.recording is None:
+                # Nothing is left viewing the file.
+                data.release()
+                mapping.close()
+            else:
+                binary.mapping = mapping
+                binary.views.append(data)
+        return binary
+
+    @staticmethod
+    def _unpack(filename: str, data: memoryview) -> 'BinaryScript':
+        """Reads the sections of a mapped file, the columns of a recording are views of it."""
+        if len(data) < BinaryScript.HEADER.size:
+            raise ValueError(f"Binary script is incomplete: {filename}")
+        header = BinaryScript.HEADER.unpack_from(data)
+        magic, version, kind, events, length, settings_size, body_size, source_size, source_mtime_ns, typecodes = header
+        if magic != BinaryScript.MAGIC or version != BinaryScript.VERSION:
+            raise ValueError(f"Not a binary script of version {BinaryScript.VERSION}: {filename}")
+        if kind not in (BinaryScript.RECORDING, BinaryScript.CODE):
+            raise ValueError(f"Binary script holds an unknown kind of body: {filename}")
+
+        offset = BinaryScript.HEADER.size + len(BinaryScript._padding(BinaryScript.HEADER.size))
+        if offset + settings_size + len(BinaryScript._padding(settings_size)) + body_size > len(data):
+            raise ValueError(f"Binary script is incomplete: {filename}")
+
+        config = ScriptConfig()
+        config.from_dict(json.loads(bytes(data[offset:offset + settings_size])))
+        offset += settings_size + len(BinaryScript._padding(settings_size))
+
+        if kind == BinaryScript.CODE:
+            # The padding after the last line is removed.
+            code = bytes(data[offset:offset + body_size]).decode().rstrip("\0")
+            binary = BinaryScript(config, code=code.split("\n")[:-1])
+            binary.source_size, binary.source_mtime_ns = source_size, source_mtime_ns
+            return binary
+
+        # The columns are checked to fill the body before any are viewed.
+        types = typecodes.decode("ascii", "replace")
+        if any(typecode not in BinaryScript.SIGNED + BinaryScript.UNSIGNED for typecode in types):
+            raise ValueError(f"Binary script has unknown column types: {filename}")
+        sizes = [events * array(typecode).itemsize for typecode in types]
+        if sum(size + len(BinaryScript._padding(size)) for size in sizes) != body_size:
+            raise ValueError(f"Binary script columns do not match the size of its body: {filename}")
+
+        recording = Recording()
+        recording.length = length
+        binary = BinaryScript(config, recording=recording)
+        binary.source_size, binary.source_mtime_ns = source_size, source_mtime_ns
+        columns = []
+        for typecode, size in zip(types, sizes):
+            section = data[offset:offset + size]
+            view = section.cast(typecode)
+            binary.views += [view, section]
+            if sys.byteorder == "big" and view.itemsize > 1:
+                # Copied to be swapped into the order of the machine.
+                view = array(typecode, view.tobytes())
+                view.byteswap()
+            columns.append(view)
+            offset += size + len(BinaryScript._padding(size))
+        recording.frames, recording.xs, recording.ys, recording.args, recording.opcodes = columns
+        return binary
+
+
+def binary_filename(filename: str) -> str:
+    """Name of the binary companion of a script."""
+    return f"{filename}b"
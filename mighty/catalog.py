@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Iterator, Optional
+from script import Script
+from lang.recording import Recording
+
+
+class CatalogEntry:
+    """Summary of a script file, enough to list it and show its settings without opening it."""
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.size: int = 0
+        self.mtime_ns: int = 0
+        self.settings: dict[str, Any] = {}  # As given by `ScriptConfig.to_dict`.
+        self.lines: int = 0
+        self.frames: Optional[int] = None  # Only known for recordings.
+        self.digest: str = ""  # Hash of the code.
+
+    @staticmethod
+    def index(path: str, stat: os.stat_result) -> 'CatalogEntry':
+        """Reads the script to create its entry. The code is read once, as it is hashed,
+        counted, and packed into a recording all at the same time.
+        """
+        script = Script.load_script(path)
+        entry = CatalogEntry(os.path.basename(path))
+        entry.size = stat.st_size
+        entry.mtime_ns = stat.st_mtime_ns
+        entry.settings = script.config.to_dict()
+
+        digest = hashlib.sha256()
+
+        def counted() -> Iterator[str]:
+            for line in script.lines():
+                digest.update(line.encode())
+                digest.update(b"\n")
+                entry.lines += 1
+                yield line
+
+        lines = counted()
+        recording = Recording.parse(lines)
+        if recording is not None:
+            entry.frames = recording.length
+        # The lines left over once the script turned out not to be a recording.
+        for _ in lines:
+            pass
+        entry.digest = digest.hexdigest()
+        return entry
+
+    def from_dict(self, data: dict[str, Any]) -> None:
+        """Loads the entry from a dictionary."""
+        self.size = data.get("size", self.size)
+        self.mtime_ns = data.get("mtime_ns", self.mtime_ns)
+        self.settings = data.get("settings", self.settings)
+        self.lines = data.get("lines", self.lines)
+        self.frames = data.get("frames", self.frames)
+        self.digest = data.get("digest", self.digest)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Converts the entry to a dictionary."""
+        return {
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "settings": self.settings,
+            "lines": self.lines,
+            "frames": self.frames,
+            "digest": self.digest,
+        }
+
+
+class ScriptCatalog:
+    """Index of the scripts in a directory, kept in a file so the scripts do not have to
+    be opened to be listed. Scripts are polled for changes on a background thread, and
+    only the scripts whose size or modification time changed are read again.
+    """
+    INDEX: str = "__mx3catalog__.json"
+    POLL_INTERVAL: float = 2.0  # Seconds between checking the directory for changes.
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory: str = directory if directory is not None else os.getcwd()
+        self.entries: dict[str, CatalogEntry] = {}  # By the filename of the script.
+        self.lock = threading.Lock()  # Held while the entries are changed or saved.
+
+        # Polling thread and the callback for when entries change.
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.on_change: Optional[Callable[[], None]] = None
+
+        self.load()
+
+    @property
+    def path(self) -> str:
+        """Location of the index file."""
+        return os.path.join(self.directory, ScriptCatalog.INDEX)
+
+    def names(self) -> list[str]:
+        """Filenames of the scripts in the catalog, in alphabetical order."""
+        return sorted(self.entries)
+
+    def entry(self, name: str) -> Optional[CatalogEntry]:
+        """Obtains the entry of the script, if it has been indexed."""
+        return self.entries.get(name)
+
+    def load(self) -> None:
+        """Reads the index file, starting empty if there is none or it cannot be read."""
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+
+        entries = {}
+        for name, values in data.get("scripts", {}).items():
+            entry = CatalogEntry(name)
+            entry.from_dict(values)
+            entries[name] = entry
+        self.entries = entries
+
+    def save(self) -> None:
+        """Writes the index file under a temporary name and renames it over the index."""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w') as file:
+            json.dump({"scripts": {name: entry.to_dict() for name, entry in self.entries.items()}}, file)
+        os.replace(temporary, self.path)
+
+    def scan(self) -> tuple[dict[str, os.DirEntry], bool]:
+        """Lists the scripts in the directory without reading them. Scripts that are new
+        are given an entry that is yet to be indexed, and the entries of scripts that are
+        gone are removed. Returns the scripts found by filename, and True if any were
+        added or removed.
+        """
+        found = {item.name: item for item in os.scandir(self.directory)
+                 if item.name.endswith(".mx3") and item.is_file()}
+        with self.lock:
+            if set(found) == set(self.entries):
+                return found, False
+            # Replaced as a whole, so readers on other threads never see a partial update.
+            self.entries = {name: self.entries.get(name) or CatalogEntry(name) for name in found}
+        return found, True
+
+    def refresh(self) -> bool:
+        """Updates the entries of the scripts added, changed, or removed since the last
+        refresh, saving the index if any did. Scripts are listed before any are read, the
+        callback is called once they are, and each entry is published as soon as its
+        script is indexed. Returns True if the entries changed.
+        """
+        found, changed = self.scan()
+        if changed and self.on_change is not None:
+            self.on_change()
+
+        for name, item in found.items():
+            if self.stop_event.is_set():
+                break
+
+            stat = item.stat()
+            entry = self.entries.get(name)
+            if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                continue
+            try:
+                indexed = CatalogEntry.index(item.path, stat)
+            except Exception as e:
+                print(f"Unable to index the script '{name}': {e}")
+                continue
+
+            with self.lock:
+                # Only replaces an entry, so the scripts listed never change while being read.
+                if name in self.entries:
+                    self.entries[name] = indexed
+                    changed = True
+
+        if changed:
+            with self.lock:
+                self.save()
+        return changed
+
+    def start(self, on_change: Optional[Callable[[], None]] = None) -> None:
+        """Starts polling the directory on a background thread. The callback is called
+        from that thread whenever scripts are added or removed.
+        """
+        self.on_change = on_change
+        if self.thread and self.thread.is_alive():
+            return
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run_poll)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stops polling the directory."""
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def poll_now(self) -> None:
+        """Has the background thread check the directory without waiting for the interval."""
+        self.wake_event.set()
+
+    def run_poll(self) -> None:
+        """Refreshes the catalog until stopped."""
+        while not self.stop_event.is_set():
+            try:
+                self.refresh()
+            except OSError as e:
+                print(f"Unable to refresh the script catalog: {e}")
+
+            self.wake_event.wait(ScriptCatalog.POLL_INTERVAL)
+            self.wake_event.clear()
@@ -1,4 +1,6 @@
+from array import array
 from enum import Enum
+from typing import Iterable, Iterator, Optional
 from util import Vec2
 
 
@@ -6,6 +8,9 @@ class EventType(Enum):
     """Types of actions taken by the user."""
     MPOS = "mpos"
     MCLICK = "mclick"
+    MDOWN = "mdown"
+    MUP = "mup"
+    MSCROLL = "mscroll"
     MMOVE = "mmove"
     WAIT = "wait"
 
@@ -62,3 +67,179 @@ class MouseClick(Event):
 
     def __str__(self) -> str:
         return f"{self.type.value}(\"{self.button}\", {str(self.randomness).lower()})"
+
+
+class MouseDown(Event):
+    """Records a mouse button being pressed and held."""
+
+    def __init__(self, button: str) -> None:
+        super().__init__(EventType.MDOWN)
+        self.button: str = button
+
+    def __str__(self) -> str:
+        return f"{self.type.value}(\"{self.button}\")"
+
+
+class MouseUp(Event):
+    """Records a held mouse button being released."""
+
+    def __init__(self, button: str) -> None:
+        super().__init__(EventType.MUP)
+        self.button: str = button
+
+    def __str__(self) -> str:
+        return f"{self.type.value}(\"{self.button}\")"
+
+
+class MouseScroll(Event):
+    """Records the mouse wheel being scrolled horizontally and vertically."""
+
+    def __init__(self, dx: int, dy: int) -> None:
+        super().__init__(EventType.MSCROLL)
+        self.dx: int = dx
+        self.dy: int = dy
+
+    def __str__(self) -> str:
+        return f"{self.type.value}({self.dx}, {self.dy})"
+
+
+# An event as it was captured: (timestamp_ns, kind, x, y, button).
+Record = tuple[int, EventType, int, int, int]
+
+
+class EventLog:
+    """Compact log of the events captured by the recorder, stored as typed columns
+    rather than objects. Events are logged with the monotonic time they happened at,
+    and are only quantized into frames and converted into the lines of a script when
+    the recording is saved.
+    """
+    # Buttons by the index stored in the button column.
+    BUTTONS: tuple[str, ...] = ("left", "right", "middle")
+    KINDS: tuple[EventType, ...] = tuple(EventType)
+
+    def __init__(self) -> None:
+        self.timestamps: array = array('q')  # Nanoseconds of `time.perf_counter_ns`.
+        self.kinds: array = array('B')
+        self.xs: array = array('i')
+        self.ys: array = array('i')
+        self.buttons: array = array('B')
+        self._kind_index: dict[EventType, int] = {kind: i for i, kind in enumerate(EventLog.KINDS)}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @property
+    def nbytes(self) -> int:
+        """Amount of bytes used by the events of the log."""
+        columns = (self.timestamps, self.kinds, self.xs, self.ys, self.buttons)
+        return sum(len(column) * column.itemsize for column in columns)
+
+    def append(self, timestamp_ns: int, kind: EventType, x: int = 0, y: int = 0, button: int = 0) -> None:
+        """Adds an event to the end of the log, events must be appended in order of time."""
+        self.timestamps.append(timestamp_ns)
+        self.kinds.append(self._kind_index[kind])
+        self.xs.append(x)
+        self.ys.append(y)
+        self.buttons.append(button)
+
+    def clear(self) -> None:
+        """Removes every event from the log, keeping the memory of the columns for reuse."""
+        for column in (self.timestamps, self.kinds, self.xs, self.ys, self.buttons):
+            del column[:]
+
+    def records(self) -> Iterator[Record]:
+        """Iterates over the events of the log in order of time, as records."""
+        for i in range(len(self)):
+            yield self.timestamps[i], EventLog.KINDS[self.kinds[i]], self.xs[i], self.ys[i], self.buttons[i]
+
+    def render(self, randomness: bool, period_ns: int, start_ns: int = 0) -> list[str]:
+        """Converts the events into the lines of a script, with frames of the period
+        beginning at the start time.
+        """
+        return list(render(events(self.records(), randomness, period_ns, start_ns)))
+
+
+def create_event(record: Record, randomness: bool) -> Event:
+    """Creates the event of a record."""
+    _, kind, x, y, button = record
+    if kind == EventType.MPOS:
+        return MousePosition(Vec2((x, y)))
+    elif kind == EventType.MCLICK:
+        return MouseClick(EventLog.BUTTONS[button], randomness)
+    elif kind == EventType.MDOWN:
+        return MouseDown(EventLog.BUTTONS[button])
+    elif kind == EventType.MUP:
+        return MouseUp(EventLog.BUTTONS[button])
+    elif kind == EventType.MSCROLL:
+        return MouseScroll(x, y)
+    else:
+        raise ValueError(f"Unable to create an event of type: {kind}")
+
+
+def quantize(records: Iterable[Record], start_ns: int, period_ns: int) -> Iterator[tuple[int, Record]]:
+    """Assigns the records to the frames they happened within, as (frame, record).
+    Only the last movement of a frame is kept, along with the movements that lead
+    up to a click so that it happens at the right position.
+    """
+    move: Optional[tuple[int, Record]] = None  # Latest movement that has not been kept.
+    position: Optional[tuple[int, int]] = None  # Position of the last movement kept.
+    for record in records:
+        timestamp_ns, kind, x, y, _ = record
+        frame = max((timestamp_ns - start_ns) // period_ns, 0)
+        if kind == EventType.MPOS:
+            if move is not None and move[0] != frame:
+                yield move
+                position = (move[1][2], move[1][3])
+            move = None if position == (x, y) else (frame, record)
+            continue
+
+        if move is not None:
+            yield move
+            position = (move[1][2], move[1][3])
+            move = None
+        yield frame, record
+
+    if move is not None:
+        yield move
+
+
+def events(records: Iterable[Record], randomness: bool, period_ns: int, start_ns: int = 0) -> Iterator[tuple[int, Event]]:
+    """Creates the events of every frame, as (frame, event). A button pressed and
+    released on the same frame, without moving in between, becomes a click.
+    """
+    pending: Optional[tuple[int, Record]] = None  # Button press that may become a click.
+    for frame, record in quantize(records, start_ns, period_ns):
+        if pending is not None:
+            pending_frame, press = pending
+            pending = None
+            if frame == pending_frame and record[1] == EventType.MUP and record[4] == press[4]:
+                yield frame, MouseClick(EventLog.BUTTONS[press[4]], randomness)
+                continue
+            yield pending_frame, create_event(press, randomness)
+
+        if record[1] == EventType.MDOWN:
+            pending = (frame, record)
+        else:
+            yield frame, create_event(record, randomness)
+
+    if pending is not None:
+        yield pending[0], create_event(pending[1], randomness)
+
+
+def render(events: Iterable[tuple[int, Event]]) -> Iterator[str]:
+    """Converts the events, as (frame, event) in order of their frame, into the lines of
+    a script. Events of the same frame are joined with `->`, and the frames without
+    events in between become waits. Lines are produced as the events are consumed.
+    """
+    previous = -1  # Frame of the previous event.
+    for frame, event in events:
+        if frame == previous:
+            yield f"\t-> {event}"
+            continue
+
+        # The wait is processed on a frame of its own, followed by the frames waited.
+        gap = frame - previous
+        if gap >= 2:
+            yield str(Wait(gap - 2))
+        yield str(event)
+        previous = frame
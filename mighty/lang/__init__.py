@@ -1,65 +1,169 @@
-from typing import Union, Iterator, Optional
-import time
+from typing import Union, Iterable, Iterator, Optional
+import itertools
+import threading
 from .params import EngineParameters
-from .node import ASTNode
+from .clock import FrameClock, VirtualClock
+from .backend import InputBackend, RecordingBackend, create_backend
+from .mouse_controller import MouseController
 from .lexer import Lexer
 from .parser import Parser
-from .interpreter import Interpreter
+from .environment import Environment
+from .builtins import add_builtins
+from .compiler import Compiler, Code
+from .recording import Recording, RecordingPlayer
+from .optimizer import Optimizer
+from .node import ASTNode, ProgramNode, FunctionCallNode, LiteralNode, SameFrameNode
+from .backend import Point
 
 
 class Engine:
     """Contains all of the relative information to process a script."""
+    # Duration of the smooth movement to the start of the script.
+    SMOOTH_START_MS: int = 250
+
+    def __init__(self, code: Union[str, Iterable[str], ProgramNode, Recording], config: EngineParameters,
+                 stop_event: Optional[threading.Event] = None) -> None:
+        self.fps = config.fps
+        self.stop_event = stop_event  # Interrupts waits early when set.
+        if config.headless:
+            # Runs as fast as possible, recording the inputs with virtual timestamps.
+            self.clock: FrameClock = VirtualClock(config.fps)
+            self.backend: InputBackend = RecordingBackend(self.clock)
+        else:
+            self.clock = FrameClock(config.fps, config.overrun_policy)
+            self.backend = create_backend(config.backend)
+
+        self.environment = Environment(MouseController(self.backend, True, config.mouse_randomness))
+        add_builtins(self.environment)
+
+        # Position to smoothly move to before the first frame of the script.
+        self.smooth_start: Optional[Point] = None
 
-    def __init__(self, code: Union[str, Iterator[str]], config: EngineParameters) -> None:
         if isinstance(code, str):
             # If code is a string, split it into lines.
-            self.lines: list[str] = Engine._code_clean(code.splitlines())
+            code = code.splitlines()
+        if not config.streaming and not isinstance(code, (ProgramNode, Recording, Iterator)):
+            # Scripts of only recorded events are played without being parsed. Streamed
+            # scripts are not checked, as that would read them entirely before the first frame.
+            recording = Recording.parse(code)
+            if recording is not None:
+                code = recording
+
+        if isinstance(code, Recording):
+            if config.smooth:
+                self.smooth_start = code.start_position()
+            self.iteration: Iterator[Code] = iter(RecordingPlayer(code))
+            return
+
+        if isinstance(code, ProgramNode):
+            # Already parsed, such as a program loaded from the cache.
+            statements: Iterator[ASTNode] = iter(code.statements)
         else:
-            # If code is an iterator, convert it to a list of lines.
-            self.lines: list[str] = Engine._code_clean(list(code))
+            # Each stage only pulls from the stage before it as statements are needed.
+            tokens = Lexer(Engine._code_clean(code)).tokenize()
+            statements = Parser(tokens).statements()
 
-        lexer = Lexer(self.lines)
-        tokens = list(lexer.tokenize())
+        if config.optimize and not config.streaming:
+            # The entire program is available, it can be rewritten before the first frame.
+            program = code if isinstance(code, ProgramNode) else ProgramNode(list(statements))
+            statements = iter(Optimizer().optimize(program).statements)
 
-        parser = Parser(tokens)
-        self.ast = parser.parse()
-        self.fps = config.fps
-        self.interpreter = Interpreter()
-        self.iteration = iter(self.ast.statements)
+        first = next(statements, None)
+        if first is not None:
+            statements = itertools.chain([first], statements)
+            if config.smooth:
+                self.smooth_start = Engine._start_position(first)
+
+        compiler = Compiler()
+        if config.streaming:
+            # Statements are lexed, parsed, and compiled on the frame they are processed.
+            self.iteration = map(compiler.compile_statement, statements)
+        else:
+            # Lower the AST ahead of time so frames only execute compiled code.
+            # Undefined names are reported here, before the first frame is processed.
+            self.iteration = iter([compiler.compile_statement(statement) for statement in statements])
 
     @staticmethod
-    def _code_clean(code: list[str]) -> list[str]:
+    def _code_clean(code: Iterable[str]) -> Iterator[str]:
         """Removes whitespace and blank lines for tokenization."""
-        return [line.strip() for line in code if line.strip()]
+        return (line.strip() for line in code if line and not line.isspace())
+
+    @staticmethod
+    def _start_position(statement: ASTNode) -> Optional[Point]:
+        """Obtains the position of the first `mpos` within the statement, if it is literal."""
+        calls = statement.statements if isinstance(statement, SameFrameNode) else [statement]
+        for call in calls:
+            if isinstance(call, FunctionCallNode) and call.name == "mpos":
+                if len(call.args) == 2 and all(isinstance(arg, LiteralNode) for arg in call.args):
+                    return call.args[0].value, call.args[1].value
+                return None
+        return None
 
     def run(self) -> None:
         """Processes the entire script."""
-        while self.next():
+        while not (self.stop_event and self.stop_event.is_set()) and self.next():
             pass
+        self.stop()
 
     def next(self) -> bool:
-        """Processes the next frame, pausing for the maximum of 
-        the interval time.
+        """Processes the next frame, pausing until the deadline of the frame.
+        Waited frames are all slept through at once.
         """
-        node: Optional[ASTNode] = None
-        if self.interpreter.environment.wait == 0:
-            try:
-                node = next(self.iteration)
-            except StopIteration:
-                return False
+        mouse = self.environment.mouse
+        if self.smooth_start is not None:
+            self.frame(self.start_transition)
+            return True
 
-        start = time.time()
+        if self.environment.wait > 0:
+            # Scheduled releases are processed every frame, otherwise
+            # sleep through every waited frame with a single deadline.
+            frames = 1 if mouse.busy else self.environment.wait
+            self.environment.wait -= frames
+            self.frame(None, frames)
+            return True
 
-        # Process the next node or continue to pause.
-        if self.interpreter.environment.wait > 0:
-            self.interpreter.environment.wait -= 1
-        elif node:
-            self.interpreter.interpret(node)
+        try:
+            code = next(self.iteration)
+        except StopIteration:
+            if mouse.busy:
+                # Allow the scheduled releases to finish before ending.
+                self.frame(None)
+                return True
+            self.stop()
+            return False
 
-        # Calculate elapsed time and the required sleep time in seconds.
-        sleep_time = (1.0 / self.fps) - (time.time() - start)
+        self.frame(code)
+        return True
 
-        if sleep_time > 0.0:
-            time.sleep(sleep_time)
+    def start_transition(self, env: Environment) -> None:
+        """Smoothly moves from the current position to the start of the script,
+        waiting for the movement to complete.
+        """
+        frames = max(self.fps * Engine.SMOOTH_START_MS // 1000, 1)
+        x, y = self.smooth_start
+        self.smooth_start = None
 
-        return True
+        env.mouse.update_position()
+        env.mouse.move_smooth(x, y, frames, ease=True)
+        env.wait = frames - 1
+
+    def frame(self, code: Optional[Code], frames: int = 1) -> None:
+        """Processes the code for a frame, or pauses for multiple frames, sending
+        the inputs at the deadline.
+        """
+        if not self.clock.started:
+            self.clock.start()
+
+        mouse = self.environment.mouse
+        mouse.update(self.clock.now_ns())
+        if code:
+            code(self.environment)
+        self.clock.tick(frames, self.stop_event)
+
+        # Send every input of the frame together at its deadline.
+        mouse.flush()
+
+    def stop(self) -> None:
+        """Releases any buttons that are still held by the script."""
+        self.environment.mouse.release_all()
+        self.environment.mouse.flush()
@@ -0,0 +1,194 @@
+from typing import Any, Callable
+from .clock import VirtualClock
+
+"""Represents a point in a 2D space."""
+Point = tuple[int, int]
+
+"""An input action for a backend to perform: (action, *arguments)."""
+InputAction = tuple[Any, ...]
+
+
+class FlushStats:
+    """Size and latency of the batches of actions flushed to a backend."""
+
+    def __init__(self) -> None:
+        self.flushes: int = 0
+        self.actions: int = 0
+        self.max_batch: int = 0
+        self.total_ns: int = 0
+        self.max_ns: int = 0
+
+    def record(self, batch_size: int, latency_ns: int) -> None:
+        """Records a batch that was flushed and how long it took."""
+        self.flushes += 1
+        self.actions += batch_size
+        self.max_batch = max(self.max_batch, batch_size)
+        self.total_ns += latency_ns
+        self.max_ns = max(self.max_ns, latency_ns)
+
+    @property
+    def mean_batch(self) -> float:
+        """Average amount of actions per flush."""
+        return self.actions / self.flushes if self.flushes > 0 else 0.0
+
+    @property
+    def mean_ns(self) -> float:
+        """Average amount of nanoseconds taken by a flush."""
+        return self.total_ns / self.flushes if self.flushes > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"flushes={self.flushes} mean_batch={self.mean_batch:.2f} max_batch={self.max_batch} "
+                f"mean_latency={self.mean_ns / 1e3:.1f}us max_latency={self.max_ns / 1e3:.1f}us")
+
+
+class InputBackend:
+    """Performs the raw input actions requested by the controllers."""
+
+    def position(self) -> Point:
+        """Obtains the current cursor position."""
+        raise NotImplementedError
+
+    def move_to(self, x: int, y: int) -> None:
+        """Moves the cursor to the x, y position."""
+        raise NotImplementedError
+
+    def mouse_down(self, button: str) -> None:
+        """Presses and holds the mouse button."""
+        raise NotImplementedError
+
+    def mouse_up(self, button: str) -> None:
+        """Releases the mouse button."""
+        raise NotImplementedError
+
+    def scroll(self, dx: int, dy: int) -> None:
+        """Scrolls the mouse wheel, positive amounts scroll right and up."""
+        raise NotImplementedError
+
+    def flush(self, actions: list[InputAction]) -> None:
+        """Performs all of the actions as a single batch, in order."""
+        for action in actions:
+            if action[0] == "move":
+                self.move_to(action[1], action[2])
+            elif action[0] == "down":
+                self.mouse_down(action[1])
+            elif action[0] == "up":
+                self.mouse_up(action[1])
+            elif action[0] == "scroll":
+                self.scroll(action[1], action[2])
+            else:
+                raise RuntimeError(f"Unknown input action: {action}")
+
+
+class PyAutoGUIBackend(InputBackend):
+    """Performs the inputs on the display using pyautogui."""
+
+    def __init__(self) -> None:
+        # Imported here so headless environments never require a display.
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def position(self) -> Point:
+        return tuple(self.pyautogui.position())
+
+    def move_to(self, x: int, y: int) -> None:
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def mouse_down(self, button: str) -> None:
+        self.pyautogui.mouseDown(button=button, _pause=False)
+
+    def mouse_up(self, button: str) -> None:
+        self.pyautogui.mouseUp(button=button, _pause=False)
+
+    def scroll(self, dx: int, dy: int) -> None:
+        if dy != 0:
+            self.pyautogui.scroll(dy, _pause=False)
+        if dx != 0:
+            self.pyautogui.hscroll(dx, _pause=False)
+
+
+class XTestBackend(InputBackend):
+    """Performs the inputs directly through the X11 XTest extension."""
+    # Maps the mouse buttons to the X11 button numbers.
+    BUTTONS: dict[str, int] = {"left": 1, "middle": 2, "right": 3}
+    # X11 buttons of the wheel, each click of the wheel is a press and release.
+    SCROLL_UP, SCROLL_DOWN, SCROLL_LEFT, SCROLL_RIGHT = 4, 5, 6, 7
+
+    def __init__(self) -> None:
+        try:
+            from Xlib import X, display
+            from Xlib.ext import xtest
+        except ImportError:
+            raise RuntimeError("The 'xtest' input backend requires the python-xlib package.")
+
+        self.X = X
+        self.xtest = xtest
+        self.display = display.Display()
+        if not self.display.has_extension("XTEST"):
+            raise RuntimeError("The X server does not support the XTEST extension.")
+        self.root = self.display.screen().root
+
+    def position(self) -> Point:
+        pointer = self.root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def move_to(self, x: int, y: int) -> None:
+        self.xtest.fake_input(self.display, self.X.MotionNotify, x=x, y=y)
+
+    def mouse_down(self, button: str) -> None:
+        self.xtest.fake_input(self.display, self.X.ButtonPress, XTestBackend.BUTTONS[button])
+
+    def mouse_up(self, button: str) -> None:
+        self.xtest.fake_input(self.display, self.X.ButtonRelease, XTestBackend.BUTTONS[button])
+
+    def scroll(self, dx: int, dy: int) -> None:
+        vertical = XTestBackend.SCROLL_UP if dy > 0 else XTestBackend.SCROLL_DOWN
+        horizontal = XTestBackend.SCROLL_RIGHT if dx > 0 else XTestBackend.SCROLL_LEFT
+        for button in [vertical] * abs(dy) + [horizontal] * abs(dx):
+            self.xtest.fake_input(self.display, self.X.ButtonPress, button)
+            self.xtest.fake_input(self.display, self.X.ButtonRelease, button)
+
+    def flush(self, actions: list[InputAction]) -> None:
+        # Events are buffered by the connection, a single round trip delivers all of them.
+        super().flush(actions)
+        self.display.sync()
+
+
+class RecordingBackend(InputBackend):
+    """Null input sink that records every action with the time of the clock
+    instead of performing it. Used to run scripts without a display.
+    """
+
+    def __init__(self, clock: VirtualClock, start: Point = (0, 0)) -> None:
+        self.clock: VirtualClock = clock
+        self.cursor: Point = start
+        self.actions: list[InputAction] = []  # Recorded as (timestamp_ns, action, *arguments).
+
+    def position(self) -> Point:
+        return self.cursor
+
+    def move_to(self, x: int, y: int) -> None:
+        self.cursor = (x, y)
+        self.actions.append((self.clock.now_ns(), "move", x, y))
+
+    def mouse_down(self, button: str) -> None:
+        self.actions.append((self.clock.now_ns(), "down", button))
+
+    def mouse_up(self, button: str) -> None:
+        self.actions.append((self.clock.now_ns(), "up", button))
+
+    def scroll(self, dx: int, dy: int) -> None:
+        self.actions.append((self.clock.now_ns(), "scroll", dx, dy))
+
+
+# Maps the selectable backend names to the backend that is created.
+BACKENDS: dict[str, Callable[[], InputBackend]] = {
+    "pyautogui": PyAutoGUIBackend,
+    "xtest": XTestBackend,
+}
+
+
+def create_backend(name: str) -> InputBackend:
+    """Creates the input backend by its name."""
+    if name not in BACKENDS:
+        raise RuntimeError(f"Invalid input backend: '{name}'. Valid options are {', '.join(BACKENDS)}.")
+    return BACKENDS[name]()
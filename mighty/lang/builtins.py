@@ -1,13 +1,15 @@
-from typing import Any, Callable
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
 from .environment import Environment, BuiltinFunction
 from .mouse_controller import MouseButton
 
 
 def builtin_wait(env: Environment, interval: int) -> None:
     """Waits for a specified amount of frames."""
-    if env.wait > 0:
+    # Waits always belong to the global environment, even when called within a function.
+    if env.globals.wait > 0:
         return
-    env.wait = interval
+    env.globals.wait = interval
 
 
 def builtin_mouse_position(env: Environment, x: int, y: int) -> None:
@@ -15,15 +17,44 @@ def builtin_mouse_position(env: Environment, x: int, y: int) -> None:
     env.mouse.move_cursor(x, y)
 
 
-def builtin_mouse_click(env: Environment, button_id: str, randomize: bool = False) -> None:
-    """Presses a mouse button to simulate a click."""
+def builtin_mouse_move(env: Environment, x: int, y: int, frames: int) -> None:
+    """Moves the mouse to a specific position over multiple frames."""
+    env.mouse.move_smooth(x, y, frames)
+
+
+def _mouse_button(button_id: str) -> MouseButton:
+    """Obtains the mouse button from its name."""
     try:
-        button: MouseButton = MouseButton(button_id.lower())
-        env.mouse.click_button(button, randomize)
+        return MouseButton(button_id.lower())
     except ValueError:
         raise RuntimeError(f"Invalid mouse button: '{button_id}'. Valid options are 'left', 'right', or 'middle'.")
 
 
+def builtin_mouse_click(env: Environment, button_id: str, randomize: bool = False) -> None:
+    """Presses a mouse button to simulate a click."""
+    env.mouse.click_button(_mouse_button(button_id), randomize)
+
+
+def builtin_mouse_down(env: Environment, button_id: str) -> None:
+    """Presses and holds a mouse button."""
+    env.mouse.press_button(_mouse_button(button_id))
+
+
+def builtin_mouse_up(env: Environment, button_id: str) -> None:
+    """Releases a held mouse button."""
+    env.mouse.release_button(_mouse_button(button_id))
+
+
+def builtin_mouse_scroll(env: Environment, dx: int, dy: int) -> None:
+    """Scrolls the mouse wheel, positive amounts scroll right and up."""
+    env.mouse.scroll(dx, dy)
+
+
+def builtin_mouse_drag(env: Environment, x: int, y: int, button_id: str = "left") -> None:
+    """Holds a mouse button while moving to a specific position."""
+    env.mouse.drag_to(x, y, _mouse_button(button_id))
+
+
 def builtin_print(_: Environment, *args: Any) -> None:
     """Prints to the console."""
     print(*args)
@@ -67,7 +98,12 @@ def builtin_str(_: Environment, arg: Any) -> str:
 BUILTINS: dict[str, Callable[..., Any]] = {
     "wait": builtin_wait,
     "mpos": builtin_mouse_position,
+    "mmove": builtin_mouse_move,
     "mclick": builtin_mouse_click,
+    "mdown": builtin_mouse_down,
+    "mup": builtin_mouse_up,
+    "mdrag": builtin_mouse_drag,
+    "mscroll": builtin_mouse_scroll,
     "print": builtin_print,
     "len": builtin_len,
     "type": builtin_type,
@@ -77,7 +113,12 @@ BUILTINS: dict[str, Callable[..., Any]] = {
 }
 
 
+# Immutable table of the wrapped built-in functions, shared by every environment.
+BUILTIN_FUNCTIONS: Mapping[str, BuiltinFunction] = MappingProxyType(
+    {name: BuiltinFunction(func) for name, func in BUILTINS.items()}
+)
+
+
 def add_builtins(environment: Environment) -> None:
-    """Add built-in functions to the functions environment."""
-    for name, func in BUILTINS.items():
-        environment.functions[name] = BuiltinFunction(func)
+    """Add built-in functions to the environment, along with any local environments created from it."""
+    environment.builtins = BUILTIN_FUNCTIONS
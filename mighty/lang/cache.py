@@ -0,0 +1,137 @@
+from typing import Iterable, Optional
+import hashlib
+import os
+import pickle
+import time
+from .lexer import Lexer
+from .parser import Parser
+from .node import ProgramNode
+from .compiler import COMPILER_VERSION
+
+
+class ProgramCache:
+    """Stores parsed programs on disk so unchanged scripts are not lexed and parsed
+    again. Entries are keyed by a hash of the code and the compiler version.
+
+    Entries are unpickled, so the cache is kept in a directory of the user's own rather
+    than beside the scripts, where anyone able to write to them could run code on play.
+    """
+    DIRECTORY: str = "__mx3cache__"
+    MAX_BYTES: int = 256 * 1024 * 1024
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = MAX_BYTES) -> None:
+        self.directory: str = directory if directory is not None else ProgramCache.user_directory()
+        self.max_bytes: int = max_bytes
+
+        # Timing of the last load, to compare cold and warm starts.
+        self.last_hit: bool = False
+        self.last_load_ns: int = 0
+
+    @staticmethod
+    def user_directory() -> str:
+        """Location of the cache for the current user."""
+        base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+        if not base:
+            base = os.path.join(os.path.expanduser("~"), ".cache")
+        return os.path.join(base, "mighty", ProgramCache.DIRECTORY)
+
+    @staticmethod
+    def prefix(name: str) -> str:
+        """Beginning of the names of the entries for the script, unique to its location."""
+        location = hashlib.sha256(os.path.abspath(name).encode()).hexdigest()
+        return f"{os.path.basename(name)}.{location[:8]}."
+
+    @staticmethod
+    def key(lines: Iterable[str]) -> str:
+        """Creates the key for the code from its content and the compiler version."""
+        digest = hashlib.sha256(COMPILER_VERSION.encode())
+        for line in lines:
+            digest.update(line.encode())
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def path(self, name: str, key: str) -> str:
+        """Location of the entry for the script."""
+        return os.path.join(self.directory, f"{ProgramCache.prefix(name)}{key[:32]}.pickle")
+
+    def load(self, name: str, lines: Iterable[str]) -> ProgramNode:
+        """Obtains the program for the script from the cache, parsing and storing it if
+        the script has changed or was never cached. The lines are iterated twice. The
+        cache is only an aid, a program that cannot be stored is still returned.
+        """
+        start = time.perf_counter_ns()
+        path = self.path(name, ProgramCache.key(lines))
+
+        program = self.read(path)
+        self.last_hit = program is not None
+        if program is None:
+            program = Parser(Lexer(line.strip() for line in lines if line.strip()).tokenize()).parse()
+            try:
+                self.store(name, path, program)
+            except OSError as e:
+                print(f"Unable to cache the parsed script: {e}")
+
+        self.last_load_ns = time.perf_counter_ns() - start
+        return program
+
+    def read(self, path: str) -> Optional[ProgramNode]:
+        """Reads an entry, marking it as recently used. Entries that cannot be read or
+        were written by an incompatible version are treated as missing.
+        """
+        try:
+            with open(path, 'rb') as file:
+                program = pickle.load(file)
+            os.utime(path)
+        except Exception:
+            return None
+        return program if isinstance(program, ProgramNode) else None
+
+    def store(self, name: str, path: str, program: ProgramNode) -> None:
+        """Writes an entry, replacing any stale entries for the same script. Entries may be
+        removed by another instance at the same time, which are skipped.
+        """
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        prefix = ProgramCache.prefix(name)
+        for entry in os.listdir(self.directory):
+            if entry.startswith(prefix) and entry.endswith(".pickle") and entry[len(prefix):].count(".") == 1:
+                ProgramCache._remove(os.path.join(self.directory, entry))
+
+        # Named by the process, so instances writing the same entry do not share a file.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump(program, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        finally:
+            ProgramCache._remove(temp_path)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the cache fits its size cap.
+        Entries still being written are left alone.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".pickle"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort(reverse=True)
+
+        total = 0
+        for _, size, path in entries:
+            total += size
+            if total > self.max_bytes:
+                ProgramCache._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Removes a file, unless it is already gone."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
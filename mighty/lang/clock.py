@@ -0,0 +1,133 @@
+from enum import Enum
+from typing import Optional
+import threading
+import time
+
+
+class OverrunPolicy(Enum):
+    """How the clock recovers when a frame runs past its deadline."""
+    CATCH_UP = 'catch-up'  # Keeps the original schedule, late frames run back-to-back.
+    DROP = 'drop'          # Skips the deadlines that were missed entirely.
+    STRETCH = 'stretch'    # Restarts the schedule from the late frame.
+
+
+class FrameStats:
+    """Timing accuracy of the frames processed by a clock."""
+
+    def __init__(self) -> None:
+        self.frames: int = 0  # Deadlines that have been waited on.
+        self.overruns: int = 0  # Frames that were already past their deadline.
+        self.dropped: int = 0  # Deadlines skipped by the drop policy.
+        self.total_lateness_ns: int = 0
+        self.max_lateness_ns: int = 0
+
+    def record(self, lateness_ns: int) -> None:
+        """Records how late a frame finished compared to its deadline."""
+        self.frames += 1
+        self.total_lateness_ns += lateness_ns
+        self.max_lateness_ns = max(self.max_lateness_ns, lateness_ns)
+
+    @property
+    def mean_lateness_ns(self) -> float:
+        """Average amount of nanoseconds a frame finished after its deadline."""
+        return self.total_lateness_ns / self.frames if self.frames > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (f"frames={self.frames} overruns={self.overruns} dropped={self.dropped} "
+                f"mean_late={self.mean_lateness_ns / 1e3:.1f}us max_late={self.max_lateness_ns / 1e3:.1f}us")
+
+
+class FrameClock:
+    """Schedules frames against absolute deadlines so that oversleeping on one
+    frame does not accumulate into the following frames.
+    """
+    # Remaining time that is spun on instead of slept for precision.
+    SPIN_NS: int = 1_000_000
+
+    def __init__(self, fps: int, policy: OverrunPolicy = OverrunPolicy.CATCH_UP, spin: bool = True) -> None:
+        self.period_ns: int = 1_000_000_000 // max(fps, 1)
+        self.policy: OverrunPolicy = policy
+        self.spin_ns: int = FrameClock.SPIN_NS if spin else 0  # Sleeps through the entire wait without spinning.
+        self.deadline_ns: Optional[int] = None
+        self.stats: FrameStats = FrameStats()
+
+    @property
+    def started(self) -> bool:
+        """Checks if the schedule has been started."""
+        return self.deadline_ns is not None
+
+    def now_ns(self) -> int:
+        """Current monotonic time in nanoseconds."""
+        return time.perf_counter_ns()
+
+    def start(self) -> None:
+        """Starts the schedule, the first frame begins now."""
+        self.deadline_ns = self.now_ns()
+
+    def tick(self, frames: int = 1, stop_event: Optional[threading.Event] = None) -> bool:
+        """Waits until the end of the current frame, or the current and the
+        following frames if more than one is passed. Returns False if the
+        wait was interrupted by the stop event.
+        """
+        if self.deadline_ns is None:
+            self.start()
+
+        self.deadline_ns += self.period_ns * frames
+        now = self.now_ns()
+        if now <= self.deadline_ns:
+            if not self.sleep_until(self.deadline_ns, stop_event):
+                return False
+            self.stats.record(self.now_ns() - self.deadline_ns)
+            return True
+
+        # The frame ran past its deadline.
+        self.stats.overruns += 1
+        self.stats.record(now - self.deadline_ns)
+        if self.policy == OverrunPolicy.DROP:
+            # Skip every deadline that has already passed.
+            missed = (now - self.deadline_ns) // self.period_ns + 1
+            self.stats.dropped += missed
+            self.deadline_ns += missed * self.period_ns
+            return self.sleep_until(self.deadline_ns, stop_event)
+        elif self.policy == OverrunPolicy.STRETCH:
+            self.deadline_ns = now
+
+        return True
+
+    def sleep_until(self, deadline_ns: int, stop_event: Optional[threading.Event] = None) -> bool:
+        """Sleeps for the majority of the time left, spinning for the remainder if enabled.
+        Returns False if the stop event was set before the deadline.
+        """
+        remaining = deadline_ns - self.now_ns()
+        if remaining > self.spin_ns:
+            timeout = (remaining - self.spin_ns) / 1e9
+            if stop_event is None:
+                time.sleep(timeout)
+            elif stop_event.wait(timeout):
+                return False
+
+        while self.spin_ns > 0 and self.now_ns() < deadline_ns:
+            pass
+
+        return stop_event is None or not stop_event.is_set()
+
+
+class VirtualClock(FrameClock):
+    """Clock that never sleeps, time only moves forward as frames are ticked.
+    Allows scripts to be processed as fast as possible without a display.
+    """
+
+    def __init__(self, fps: int) -> None:
+        super().__init__(fps, OverrunPolicy.CATCH_UP)
+        self.time_ns: int = 0
+
+    def now_ns(self) -> int:
+        return self.time_ns
+
+    def advance(self, nanoseconds: int) -> None:
+        """Moves the time forward, as if the work being done took that long."""
+        self.time_ns += nanoseconds
+
+    def sleep_until(self, deadline_ns: int, stop_event: Optional[threading.Event] = None) -> bool:
+        self.time_ns = max(self.time_ns, deadline_ns)
+        return stop_event is None or not stop_event.is_set()
@@ -0,0 +1,169 @@
+import operator
+from typing import Any, Callable
+from .token import Tokens
+from .environment import Environment
+from .resolver import Resolver
+from .node import *
+
+
+# Changes whenever the parsed or compiled form of a program changes, invalidating caches.
+COMPILER_VERSION: str = "3"
+
+# A compiled node, called with the environment it should be executed within.
+Code = Callable[[Environment], Any]
+
+# Maps the operator tokens to the function that performs the operation.
+OPERATORS: dict[Tokens, Callable[[Any, Any], Any]] = {
+    Tokens.PLUS: operator.add,
+    Tokens.MINUS: operator.sub,
+    Tokens.MULTIPLY: operator.mul,
+    Tokens.DIVIDE: operator.truediv,
+    Tokens.MODULUS: operator.mod,
+    Tokens.EQUAL: operator.eq,
+    Tokens.NOT_EQUAL: operator.ne,
+    Tokens.GREATER_THAN: operator.gt,
+    Tokens.LESS_THAN: operator.lt,
+    Tokens.GREATER_EQUAL: operator.ge,
+    Tokens.LESS_EQUAL: operator.le,
+}
+
+# Maps the declarable variable types to their casting function.
+CASTS: dict[str, Callable[[Any], Any]] = {
+    "bool": bool,
+    "int": int,
+    "float": float,
+    "str": str,
+}
+
+
+class CompiledFunction:
+    """A user-defined function whose body has already been compiled."""
+
+    def __init__(self, params: list[Param], body: list[Code], frame_size: int) -> None:
+        self.params: list[Param] = params
+        self.body: list[Code] = body
+        # Slots of the local declarations that follow the parameters.
+        self.padding: list[None] = [None] * (frame_size - len(params))
+
+    def __call__(self, env: Environment, *args: Any) -> Any:
+        # Process a function, creating a new local environment over the global environment.
+        local_env = Environment(parent=env.globals, slots=[*args, *self.padding])
+
+        result = None
+        for stmt in self.body:
+            result = stmt(local_env)
+
+        return result
+
+
+class Compiler:
+    """Lowers the abstract syntax tree (AST) created by the parser into closures.
+    All dispatching on node types, operators, and literals happens once here instead of
+    every time a frame is processed.
+    """
+
+    def __init__(self) -> None:
+        self.resolver: Resolver = Resolver()
+        self._handlers: dict[type, Callable[[Any], Code]] = {
+            DeclarationNode: self.compile_declaration,
+            FunctionDefNode: self.compile_function_definition,
+            FunctionCallNode: self.compile_function_call,
+            LiteralNode: self.compile_literal,
+            IdentifierNode: self.compile_identifier,
+            ExpressionNode: self.compile_expression,
+            SameFrameNode: self.compile_same_frame,
+        }
+
+    def compile_program(self, node: ProgramNode) -> list[Code]:
+        """Compiles every statement of the program, each one being processed on a frame."""
+        return [self.compile_statement(statement) for statement in node.statements]
+
+    def compile_statement(self, node: ASTNode) -> Code:
+        """Resolves then compiles a top-level statement. Statements must be compiled in order."""
+        return self.compile(self.resolver.resolve(node))
+
+    def compile(self, node: ASTNode) -> Code:
+        """Compiles a singular node, this could be a statement or an expression."""
+        handler = self._handlers.get(type(node))
+        if handler is None:
+            raise Exception(f"Unknown node type: {type(node)}")
+        return handler(node)
+
+    def compile_declaration(self, node: DeclarationNode) -> Code:
+        """Compiles a variable declaration, casting the value to the declared type."""
+        cast = CASTS.get(node.var_type)
+        if cast is None:
+            raise TypeError(f"Unsupported variable type: {node.var_type}")
+
+        slot = node.slot
+        expression = self.compile(node.expression)
+
+        def declaration(env: Environment) -> None:
+            value = cast(expression(env))
+            slots = env.slots
+            if slot >= len(slots):
+                # The global slots grow as top-level variables are declared.
+                slots.extend([None] * (slot + 1 - len(slots)))
+            slots[slot] = value
+
+        return declaration
+
+    def compile_function_definition(self, node: FunctionDefNode) -> Code:
+        """Compiles the body of a user-defined function, storing it once processed."""
+        name = node.name
+        function = CompiledFunction(node.params, [self.compile(stmt) for stmt in node.body], node.frame_size)
+
+        def function_definition(env: Environment) -> None:
+            env.functions[name] = function
+
+        return function_definition
+
+    def compile_function_call(self, node: FunctionCallNode) -> Code:
+        """Compiles a function call, both built-in and user-defined functions
+        share the same calling convention.
+        """
+        name = node.name
+        args = [self.compile(arg) for arg in node.args]
+
+        def function_call(env: Environment) -> Any:
+            func = env.get_function(name)
+            return func(env, *[arg(env) for arg in args])
+
+        return function_call
+
+    def compile_literal(self, node: LiteralNode) -> Code:
+        """Compiles a literal into its constant value."""
+        value = node.value
+        return lambda _: value
+
+    def compile_identifier(self, node: IdentifierNode) -> Code:
+        """Compiles an identifier into an index of the slot bound by the resolver."""
+        slot = node.slot
+        if slot is None:
+            # Refers to a function rather than a variable.
+            name = node.name
+            return lambda env: env.get_function(name)
+        elif node.local:
+            return lambda env: env.slots[slot]
+        else:
+            return lambda env: env.globals.slots[slot]
+
+    def compile_expression(self, node: ExpressionNode) -> Code:
+        """Compiles a binary operation, resolving the operator ahead of time."""
+        op = OPERATORS.get(node.operator)
+        if op is None:
+            raise Exception(f"Unknown operator: {node.operator}")
+
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        return lambda env: op(left(env), right(env))
+
+    def compile_same_frame(self, node: SameFrameNode) -> Code:
+        """Compiles the statements that are required to happen on the same frame."""
+        statements = [self.compile(statement) for statement in node.statements]
+
+        def same_frame(env: Environment) -> None:
+            for statement in statements:
+                statement(env)
+
+        return same_frame
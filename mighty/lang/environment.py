@@ -1,6 +1,9 @@
-from typing import Any, Callable, Union
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional, Union
 from .node import Param, ASTNode
 from .mouse_controller import MouseController
+from .backend import RecordingBackend
+from .clock import VirtualClock
 
 
 class BuiltinFunction:
@@ -14,20 +17,43 @@ class BuiltinFunction:
 
 
 class Environment:
-    """Holds the built-in and delcared variables and functions for an instance."""
+    """Holds the built-in and delcared variables and functions for an instance.
+    Calls to user-defined functions create a local environment whose parent is the
+    global environment, sharing its functions, builtins, and mouse controller.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, mouse: Optional[MouseController] = None, parent: Optional['Environment'] = None,
+                 slots: Optional[list[Any]] = None) -> None:
+        self.parent: Optional[Environment] = parent
         self.variables: dict[str, Any] = {}
-        self.functions: dict[str, Any] = {}
-        self.wait: int = 0
-        self.mouse: MouseController = MouseController()
+        self.slots: list[Any] = slots if slots is not None else []  # Variables bound to slots by the resolver.
+        if parent is None:
+            self.globals: Environment = self
+            self.functions: dict[str, Any] = {}
+            self.builtins: Mapping[str, BuiltinFunction] = MappingProxyType({})
+            self.wait: int = 0
+            if mouse is None:
+                # Inputs are recorded instead of performed, so no display is required.
+                mouse = MouseController(RecordingBackend(VirtualClock(1)))
+            self.mouse: MouseController = mouse
+        else:
+            self.globals = parent.globals
+            self.functions = parent.functions
+            self.builtins = parent.builtins
+            self.mouse = parent.mouse
 
     def get(self, name: str) -> Any:
-        """Obtains a variables then function value if it exists."""
-        if name in self.variables:
-            return self.variables[name]
-        elif name in self.functions:
+        """Obtains a variables then function value if it exists, looking through the scope chain."""
+        env: Optional[Environment] = self
+        while env is not None:
+            if name in env.variables:
+                return env.variables[name]
+            env = env.parent
+
+        if name in self.functions:
             return self.functions[name]
+        elif name in self.builtins:
+            return self.builtins[name]
         else:
             raise NameError(f"Variable or function '{name}' not defined.")
 
@@ -40,8 +66,10 @@ class Environment:
         self.functions[name] = (params, body)
 
     def get_function(self, name: str) -> Union[BuiltinFunction, tuple[list[Param], list[ASTNode]]]:
-        """Obtains a declared function, first checking built-in functions and returns the callable object."""
+        """Obtains a declared function, user-defined functions take priority over built-in functions."""
         if name in self.functions:
             return self.functions[name]
+        elif name in self.builtins:
+            return self.builtins[name]
         else:
             raise TypeError(f"Function '{name}' is not a built-in function.")
@@ -16,7 +16,11 @@ class Interpreter:
 
     def interpret(self, node: ASTNode) -> Optional[Any]:
         """Processes a node of the AST. This could be an entire program or a singular frame."""
-        if isinstance(node, ProgramNode):
+        if isinstance(node, LiteralNode):
+            return node.value
+        elif isinstance(node, IdentifierNode):
+            return self.environment.get(node.name)
+        elif isinstance(node, ProgramNode):
             self.visit_program(node)
         elif isinstance(node, DeclarationNode):
             self.visit_declaration(node)
@@ -73,73 +77,52 @@ class Interpreter:
             args = [self.interpret(arg) for arg in node.args]
             return func(self.environment, *args)
         else:
-            # Process a function, creating a new local environment for it.
+            # Process a function, creating a new local environment over the global environment.
             params, body = func
-            local_env = Environment()
+            local_env = Environment(parent=self.environment.globals)
             for (param_name, _), arg in zip(params, node.args):
                 local_env.set(param_name, self.interpret(arg))
 
-            # Interpret the body of the function.
-            interpreter = Interpreter(environment=local_env)
-            result = None
-            for stmt in body:
-                result = interpreter.interpret(stmt)
+            # Interpret the body of the function within the local environment.
+            caller_env, self.environment = self.environment, local_env
+            try:
+                result = None
+                for stmt in body:
+                    result = self.interpret(stmt)
+            finally:
+                self.environment = caller_env
 
             return result
 
     def visit_expression(self, node: ExpressionNode) -> Any:
         """Process an expression node."""
-        if node.operator is None:
-            # Handle literals and identifiers.
-            if isinstance(node.left, str):
-                if node.left.isdigit():
-                    # Handle integer literals.
-                    return int(node.left)
-                elif node.left in {"true", "false"}:
-                    # Handle boolean literals.
-                    return node.left == "true"
-                try:
-                    # Try to convert to float.
-                    return float(node.left)
-                except ValueError:
-                    if node.left.startswith('"') and node.left.endswith('"'):
-                        # Handle string literals.
-                        return node.left.strip('"')
-                    else:
-                        # It's an identifier, so get the value from the environment.
-                        return self.environment.get(node.left)
-            else:
-                # Numeric value or pre-parsed literal.
-                return node.left
-        else:
-            # Handle binary operations.
-            left_val: Any = self.interpret(node.left)
-            right_val: Any = self.interpret(node.right)
+        left_val: Any = self.interpret(node.left)
+        right_val: Any = self.interpret(node.right)
 
-            if node.operator[0] == Tokens.PLUS:
-                return left_val + right_val
-            elif node.operator[0] == Tokens.MINUS:
-                return left_val - right_val
-            elif node.operator[0] == Tokens.MULTIPLY:
-                return left_val * right_val
-            elif node.operator[0] == Tokens.DIVIDE:
-                return left_val / right_val
-            elif node.operator[0] == Tokens.MODULUS:
-                return left_val % right_val
-            elif node.operator[0] == Tokens.EQUAL:
-                return left_val == right_val
-            elif node.operator[0] == Tokens.NOT_EQUAL:
-                return left_val != right_val
-            elif node.operator[0] == Tokens.GREATER_THAN:
-                return left_val > right_val
-            elif node.operator[0] == Tokens.LESS_THAN:
-                return left_val < right_val
-            elif node.operator[0] == Tokens.GREATER_EQUAL:
-                return left_val >= right_val
-            elif node.operator[0] == Tokens.LESS_EQUAL:
-                return left_val <= right_val
-            else:
-                raise Exception(f"Unknown operator: {node.operator}")
+        if node.operator == Tokens.PLUS:
+            return left_val + right_val
+        elif node.operator == Tokens.MINUS:
+            return left_val - right_val
+        elif node.operator == Tokens.MULTIPLY:
+            return left_val * right_val
+        elif node.operator == Tokens.DIVIDE:
+            return left_val / right_val
+        elif node.operator == Tokens.MODULUS:
+            return left_val % right_val
+        elif node.operator == Tokens.EQUAL:
+            return left_val == right_val
+        elif node.operator == Tokens.NOT_EQUAL:
+            return left_val != right_val
+        elif node.operator == Tokens.GREATER_THAN:
+            return left_val > right_val
+        elif node.operator == Tokens.LESS_THAN:
+            return left_val < right_val
+        elif node.operator == Tokens.GREATER_EQUAL:
+            return left_val >= right_val
+        elif node.operator == Tokens.LESS_EQUAL:
+            return left_val <= right_val
+        else:
+            raise Exception(f"Unknown operator: {node.operator}")
 
     def visit_same_frame(self, node: SameFrameNode) -> None:
         """Processes nodes / statements that are required to happen on
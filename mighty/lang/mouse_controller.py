@@ -1,11 +1,10 @@
 from enum import Enum
-from typing import Optional
+from array import array
+from typing import Any, Optional
 import time
 import random
-import pyautogui
-
-"""Represents a point in a 2D space."""
-Point = tuple[int, int]
+from .backend import InputBackend, PyAutoGUIBackend, InputAction, FlushStats, Point
+from .trajectory import trajectory
 
 
 class MouseButton(Enum):
@@ -25,10 +24,26 @@ class MouseController:
     MOUSE_MIN_CLICK_MS: int = 55
     MOUSE_MAX_CLICK_MS: int = 135
 
-    def __init__(self) -> None:
+    def __init__(self, backend: Optional[InputBackend] = None, batched: bool = False, randomness: float = 0.0) -> None:
+        self.backend: InputBackend = backend if backend is not None else PyAutoGUIBackend()
+        self.randomness: float = randomness
+
+        # Actions are held until the end of the frame when batched, otherwise sent immediately.
+        self.batched: bool = batched
+        self.batch: list[InputAction] = []
+        self.flush_stats: FlushStats = FlushStats()
+
+        # Releases scheduled for the future as (due_ns, button), processed by `update`.
+        self.now_ns: int = 0
+        self.releases: list[tuple[int, MouseButton]] = []
+
+        # Precomputed movement in progress, one point is moved to per frame.
+        self.path: Optional[tuple[array, array]] = None
+        self.path_index: int = 0
+
         # Initialize button states and position.
         self.mouse_buttons: dict[MouseButton, ButtonState] = {button: ButtonState.UP for button in MouseButton}
-        self.cursor_position: Optional[Point] = pyautogui.position()
+        self.cursor_position: Optional[Point] = self.backend.position()
 
     def update_state(self, button_name: MouseButton, state: ButtonState) -> None:
         """Update the state of a mouse button."""
@@ -36,7 +51,7 @@ class MouseController:
 
     def update_position(self) -> None:
         """Update the stored cursor position."""
-        position = pyautogui.position()
+        position = self.backend.position()
         if position is not None:
             self.cursor_position = position
 
@@ -44,24 +59,114 @@ class MouseController:
         """Checks to see if the mouse cursor has moved from prior location."""
         return self.cursor_position and (x != self.cursor_position[0] or y != self.cursor_position[1])
 
+    def queue(self, *action: Any) -> None:
+        """Queues an action for the backend, sending it now if not batched."""
+        self.batch.append(action)
+        if not self.batched:
+            self.flush()
+
+    def flush(self) -> None:
+        """Sends all of the queued actions to the backend as a single batch."""
+        if not self.batch:
+            return
+
+        start = time.perf_counter_ns()
+        self.backend.flush(self.batch)
+        self.flush_stats.record(len(self.batch), time.perf_counter_ns() - start)
+        self.batch = []
+
+    @property
+    def busy(self) -> bool:
+        """Checks if there are movements or releases to be processed on a later frame."""
+        return self.path is not None or len(self.releases) > 0
+
+    def update(self, now_ns: int) -> None:
+        """Updates the current time, moving along the current path and releasing
+        the buttons that are due.
+        """
+        self.now_ns = now_ns
+        if self.path is not None:
+            self.step_path()
+
+        for due_ns, button in [release for release in self.releases if release[0] <= now_ns]:
+            self.release_button(button)
+
+    def press_button(self, button: MouseButton) -> None:
+        """Presses and holds a button if it is not already held."""
+        if self.mouse_buttons[button] == ButtonState.UP:
+            self.queue("down", button.value)
+            self.update_state(button, ButtonState.DOWN)
+
+    def release_button(self, button: MouseButton) -> None:
+        """Releases a held button, cancelling any release scheduled for it."""
+        self.releases = [release for release in self.releases if release[1] != button]
+        if self.mouse_buttons[button] == ButtonState.DOWN:
+            self.queue("up", button.value)
+            self.update_state(button, ButtonState.UP)
+
+    def schedule_release(self, button: MouseButton, delay_ns: int) -> None:
+        """Releases the button once the delay has passed, without blocking the frame."""
+        self.releases.append((self.now_ns + delay_ns, button))
+
+    def release_all(self) -> None:
+        """Releases every button that is currently held."""
+        for button in MouseButton:
+            self.release_button(button)
+
     def click_button(self, button: MouseButton, randomize: bool) -> None:
-        """Simulate a click using pyautogui."""
-        pyautogui.mouseDown(button=button.value, _pause=False)
-        self.update_state(button, ButtonState.DOWN)
+        """Simulate a click using the input backend."""
+        # A held button has to be released before it can be clicked.
+        self.release_button(button)
+        self.press_button(button)
 
         if randomize:
             # Used to simulate semi-realistic time for click speed.
-            time.sleep(MouseController.click_time())
+            self.schedule_release(button, int(MouseController.click_time() * 1e9))
+        else:
+            self.release_button(button)
+
+    def scroll(self, dx: int, dy: int) -> None:
+        """Scrolls the mouse wheel horizontally and vertically."""
+        if dx != 0 or dy != 0:
+            self.queue("scroll", dx, dy)
 
-        pyautogui.mouseUp(button=button.value, _pause=False)
-        self.update_state(button, ButtonState.UP)
+    def drag_to(self, x: int, y: int, button: MouseButton) -> None:
+        """Holds the button while moving to the x, y position, releasing it on the next frame."""
+        self.press_button(button)
+        self.move_cursor(x, y)
+        self.schedule_release(button, 0)
 
     def move_cursor(self, x: int, y: int) -> None:
+        """Moves the mouse cursor to the x, y position, cancelling any movement in progress."""
+        self.path = None
+        self.step_cursor(x, y)
+
+    def step_cursor(self, x: int, y: int) -> None:
         """Moves the mouse cursor to the x, y position."""
         if self.cursor_moved(x, y):
-            pyautogui.moveTo(x, y, _pause=False)
+            self.queue("move", x, y)
             self.cursor_position = (x, y)
 
+    def move_smooth(self, x: int, y: int, frames: int, ease: bool = False) -> None:
+        """Moves the mouse cursor to the x, y position over multiple frames. The entire
+        path is computed now, each frame after only moves to the next point.
+        """
+        if frames <= 1 or self.cursor_position is None:
+            self.move_cursor(x, y)
+            return
+
+        self.path = trajectory(self.cursor_position, (x, y), frames, ease, self.randomness)
+        self.path_index = 0
+        self.step_path()
+
+    def step_path(self) -> None:
+        """Moves to the next point of the path in progress."""
+        xs, ys = self.path
+        self.step_cursor(xs[self.path_index], ys[self.path_index])
+        self.path_index += 1
+        if self.path_index >= len(xs):
+            self.path = None
+
     @staticmethod
     def click_time() -> float:
         """Amount of seconds to take for a click."""
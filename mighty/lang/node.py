@@ -1,5 +1,5 @@
-from typing import Optional, Union
-from .token import Token
+from typing import Any, Optional
+from .token import Tokens
 
 
 # Represents a parameter for a function.
@@ -7,47 +7,74 @@ Param = tuple[str, str]
 
 
 class ASTNode:
-    """Basic node that all others derive from."""
-    pass
+    """Basic node that all others derive from. Nodes use slots to keep large
+    programs, such as long recordings, compact in memory.
+    """
+    __slots__ = ()
 
 
 class DeclarationNode(ASTNode):
     """Represents a variable name, type, and value."""
+    __slots__ = ('var_type', 'identifier', 'expression', 'slot')
 
     def __init__(self, var_type: str, identifier: str, expression: ASTNode) -> None:
         self.var_type: str = var_type
         self.identifier: str = identifier
         self.expression: ASTNode = expression
+        self.slot: Optional[int] = None  # Slot of the variable within its scope, bound by the resolver.
 
 
 class FunctionDefNode(ASTNode):
     """Represents a function that is user-defined."""
+    __slots__ = ('name', 'params', 'body', 'frame_size')
 
     def __init__(self, name: str, params: list[Param], body: list[ASTNode]) -> None:
         self.name: str = name  # Identifier of the function.
         self.params: list[tuple[str, str]] = params  # List of (param_name, param_type)
         self.body: list[ASTNode] = body  # Sequential statements.
+        self.frame_size: int = len(params)  # Amount of local slots, bound by the resolver.
 
 
 class FunctionCallNode(ASTNode):
     """Represents a function call and the parameters passed."""
+    __slots__ = ('name', 'args')
 
     def __init__(self, name: str, args: list[ASTNode]) -> None:
         self.name: str = name  # Identifier for the function.
         self.args: list[ASTNode] = args  # Arguments / parameters passed.
 
 
+class LiteralNode(ASTNode):
+    """A literal value that was already converted to its type by the parser."""
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value: Any = value  # The bool, int, float, or str value.
+
+
+class IdentifierNode(ASTNode):
+    """A reference to a variable or function by its name."""
+    __slots__ = ('name', 'slot', 'local')
+
+    def __init__(self, name: str) -> None:
+        self.name: str = name
+        self.slot: Optional[int] = None  # Slot of the variable, bound by the resolver.
+        self.local: bool = False  # If the slot is within the current frame rather than the globals.
+
+
 class ExpressionNode(ASTNode):
-    """An expression (including Binary Operation.)"""
+    """A binary operation between two expressions."""
+    __slots__ = ('left', 'operator', 'right')
 
-    def __init__(self, left: Union[str, ASTNode], operator: Optional[Token] = None, right: Optional[ASTNode] = None) -> None:
-        self.left: Union[str, ASTNode] = left  # Can be a literal, identifier, or another expression.
-        self.operator: Optional[Token] = operator  # The operator, e.g., '+', '-', etc.
-        self.right: Optional[ASTNode] = right  # Right-hand side expression.
+    def __init__(self, left: ASTNode, operator: Tokens, right: ASTNode) -> None:
+        self.left: ASTNode = left  # Can be a literal, identifier, or another expression.
+        self.operator: Tokens = operator  # The operator, e.g., PLUS, MINUS, etc.
+        self.right: ASTNode = right  # Right-hand side expression.
 
 
 class SameFrameNode(ASTNode):
     """Similar to functions, these are statements that must be processed on the same frame."""
+    __slots__ = ('statements',)
 
     def __init__(self, statements: list[ASTNode]) -> None:
         self.statements: list[ASTNode] = statements
@@ -55,6 +82,7 @@ class SameFrameNode(ASTNode):
 
 class ProgramNode(ASTNode):
     """Represents an entire program, where each node is processed on a frame."""
+    __slots__ = ('statements',)
 
     def __init__(self, statements: list[ASTNode]) -> None:
         self.statements: list[ASTNode] = statements
@@ -0,0 +1,179 @@
+from typing import Optional
+from .compiler import OPERATORS
+from .node import *
+
+
+class OptimizerReport:
+    """Reductions made by the optimizer to a program."""
+
+    def __init__(self) -> None:
+        self.statements_before: int = 0  # Top-level statements, each processed on a frame of its own.
+        self.statements_after: int = 0
+        self.calls_before: int = 0
+        self.calls_after: int = 0
+        self.folded: int = 0  # Constant expressions evaluated ahead of time.
+        self.merged_waits: int = 0
+        self.dropped_moves: int = 0
+
+    def __str__(self) -> str:
+        return (f"statements={self.statements_before}->{self.statements_after} "
+                f"calls={self.calls_before}->{self.calls_after} folded={self.folded} "
+                f"merged_waits={self.merged_waits} dropped_moves={self.dropped_moves}")
+
+
+class Optimizer:
+    """Rewrites the abstract syntax tree (AST) of a program without changing what it does,
+    or which frame it does it on. Constant expressions are folded, moves to the position
+    the cursor is already at are dropped, and waits are merged into the statement before.
+    """
+    # Built-in functions that never move the cursor.
+    STATIONARY: frozenset[str] = frozenset({"wait", "mclick", "mdown", "mup", "mscroll", "print",
+                                            "len", "type", "int", "float", "str"})
+
+    def __init__(self) -> None:
+        self.report: OptimizerReport = OptimizerReport()
+        self.user_functions: set[str] = set()  # May replace the built-in functions of the same name.
+
+    def optimize(self, node: ProgramNode) -> ProgramNode:
+        """Optimizes the entire program, returning the new program."""
+        statements = node.statements
+        self.user_functions = {statement.name for statement in statements if isinstance(statement, FunctionDefNode)}
+        self.report.statements_before = len(statements)
+        self.report.calls_before = sum(Optimizer._count_calls(statement) for statement in statements)
+
+        statements = [self.fold(statement) for statement in statements]
+        if not self.user_functions & {"mpos", "wait"}:
+            statements = self.drop_moves(statements)
+        if "wait" not in self.user_functions:
+            statements = self.merge_waits(statements)
+
+        self.report.statements_after = len(statements)
+        self.report.calls_after = sum(Optimizer._count_calls(statement) for statement in statements)
+        return ProgramNode(statements)
+
+    @staticmethod
+    def _count_calls(node: ASTNode) -> int:
+        """Amount of function calls within the statement."""
+        if isinstance(node, FunctionCallNode):
+            return 1
+        elif isinstance(node, SameFrameNode):
+            return sum(Optimizer._count_calls(statement) for statement in node.statements)
+        elif isinstance(node, FunctionDefNode):
+            return sum(Optimizer._count_calls(statement) for statement in node.body)
+        return 0
+
+    def _builtin(self, node: ASTNode, name: str) -> bool:
+        """Checks if the node is a call to the built-in function."""
+        return isinstance(node, FunctionCallNode) and node.name == name and name not in self.user_functions
+
+    def fold(self, node: ASTNode) -> ASTNode:
+        """Evaluates the operations between literals, returning the same node if nothing changed."""
+        if isinstance(node, ExpressionNode):
+            left, right = self.fold(node.left), self.fold(node.right)
+            if isinstance(left, LiteralNode) and isinstance(right, LiteralNode):
+                try:
+                    value = OPERATORS[node.operator](left.value, right.value)
+                except Exception:
+                    # Errors, such as dividing by zero, still happen on the frame they would have.
+                    pass
+                else:
+                    self.report.folded += 1
+                    return LiteralNode(value)
+            if left is not node.left or right is not node.right:
+                return ExpressionNode(left, node.operator, right)
+        elif isinstance(node, FunctionCallNode):
+            args = [self.fold(arg) for arg in node.args]
+            if any(arg is not original for arg, original in zip(args, node.args)):
+                return FunctionCallNode(node.name, args)
+        elif isinstance(node, DeclarationNode):
+            expression = self.fold(node.expression)
+            if expression is not node.expression:
+                return DeclarationNode(node.var_type, node.identifier, expression)
+        elif isinstance(node, SameFrameNode):
+            return SameFrameNode([self.fold(statement) for statement in node.statements])
+        elif isinstance(node, FunctionDefNode):
+            return FunctionDefNode(node.name, node.params, [self.fold(statement) for statement in node.body])
+        return node
+
+    def drop_moves(self, statements: list[ASTNode]) -> list[ASTNode]:
+        """Removes `mpos` calls to the position the cursor was last moved to, as long as
+        nothing in between could have moved it. A frame left empty becomes `wait(0)`.
+        """
+        optimized: list[ASTNode] = []
+        position: Optional[tuple[int, int]] = None  # Known position of the cursor.
+        for statement in statements:
+            group = statement.statements if isinstance(statement, SameFrameNode) else [statement]
+            kept: list[ASTNode] = []
+            for node in group:
+                if self._builtin(node, "mpos"):
+                    target = Optimizer._literal_position(node)
+                    if target is not None and target == position:
+                        self.report.dropped_moves += 1
+                        continue
+                    position = target
+                elif isinstance(node, FunctionCallNode) and (node.name not in Optimizer.STATIONARY or
+                                                             node.name in self.user_functions):
+                    # Movements, paths in progress, and user-defined functions.
+                    position = None
+                kept.append(node)
+
+            if len(kept) == len(group):
+                optimized.append(statement)
+            elif not kept:
+                optimized.append(FunctionCallNode("wait", [LiteralNode(0)]))
+            else:
+                optimized.append(kept[0] if len(kept) == 1 else SameFrameNode(kept))
+        return optimized
+
+    @staticmethod
+    def _literal_position(node: FunctionCallNode) -> Optional[tuple[int, int]]:
+        """Obtains the position of an `mpos` call with literal integer arguments."""
+        if len(node.args) == 2 and all(isinstance(arg, LiteralNode) and type(arg.value) is int for arg in node.args):
+            return node.args[0].value, node.args[1].value
+        return None
+
+    def _frame_wait(self, statement: ASTNode) -> Optional[int]:
+        """Amount of frames waited after the statement's frame, if it is known ahead of time.
+        Only statements without user-defined functions and with at most one literal wait are known.
+        """
+        if isinstance(statement, FunctionDefNode):
+            return None
+
+        wait = None
+        for node in statement.statements if isinstance(statement, SameFrameNode) else [statement]:
+            if isinstance(node, FunctionCallNode) and node.name in self.user_functions:
+                return None
+            elif self._builtin(node, "wait"):
+                literal = len(node.args) == 1 and isinstance(node.args[0], LiteralNode)
+                if wait is not None or not literal or type(node.args[0].value) is not int or node.args[0].value < 0:
+                    return None
+                wait = node.args[0].value
+        return wait if wait is not None else 0
+
+    def merge_waits(self, statements: list[ASTNode]) -> list[ASTNode]:
+        """Merges a standalone `wait(b)` into the statement before it. The statement already
+        waits `a` frames, so together they take `a + b + 1` frames after its own.
+        """
+        optimized: list[ASTNode] = []
+        for statement in statements:
+            if optimized and self._builtin(statement, "wait") and self._frame_wait(statement) is not None:
+                previous = optimized[-1]
+                waited = self._frame_wait(previous)
+                if waited is not None:
+                    total = waited + self._frame_wait(statement) + 1
+                    optimized[-1] = self._with_wait(previous, total)
+                    self.report.merged_waits += 1
+                    continue
+            optimized.append(statement)
+        return optimized
+
+    def _with_wait(self, statement: ASTNode, frames: int) -> ASTNode:
+        """Sets the amount of frames the statement waits, adding a wait to its frame if it has none."""
+        wait = FunctionCallNode("wait", [LiteralNode(frames)])
+        if self._builtin(statement, "wait"):
+            return wait
+
+        group = statement.statements if isinstance(statement, SameFrameNode) else [statement]
+        if any(self._builtin(node, "wait") for node in group):
+            return SameFrameNode([wait if self._builtin(node, "wait") else node for node in group])
+        return SameFrameNode(group + [wait])
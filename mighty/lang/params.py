@@ -1,7 +1,19 @@
+from .clock import OverrunPolicy
+
+
 class EngineParameters:
     """Configuration settings used to modify how the engine operates."""
 
-    def __init__(self, fps: int, screen_size: tuple[int, int], mouse_randomness: float) -> None:
+    def __init__(self, fps: int, screen_size: tuple[int, int], mouse_randomness: float,
+                 overrun_policy: OverrunPolicy = OverrunPolicy.CATCH_UP, headless: bool = False,
+                 backend: str = "pyautogui", smooth: bool = False, streaming: bool = False,
+                 optimize: bool = True) -> None:
         self.screen_size = screen_size
         self.fps: int = fps
         self.mouse_randomness: float = mouse_randomness
+        self.overrun_policy: OverrunPolicy = overrun_policy
+        self.headless: bool = headless  # Virtual time, inputs are recorded instead of performed.
+        self.backend: str = backend  # Name of the input backend, see `backend.BACKENDS`.
+        self.smooth: bool = smooth  # Smoothly moves to the start of the script.
+        self.streaming: bool = streaming  # Parses the script as it is played instead of up front.
+        self.optimize: bool = optimize  # Optimizes the program before it is played, unless streaming.
@@ -1,4 +1,6 @@
-from typing import Optional, Iterator
+from collections import deque
+import sys
+from typing import Any, Optional, Iterable, Iterator
 from .token import Tokens, Token
 from .node import *
 
@@ -8,20 +10,31 @@ class Parser:
     for the interpreter to process.
     """
 
-    def __init__(self, tokens: Iterator[Token]) -> None:
-        """Initializes the Parser with a list of tokens and sets the position to the start."""
-        self.tokens: list[Token] = list(tokens)
-        self.position: int = 0
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        """Initializes the Parser with the tokens, which are only read as they are needed."""
+        self.tokens: Iterator[Token] = iter(tokens)
+        self.lookahead: deque[Token] = deque()
+
+        # Literal nodes are never modified, so numbers and booleans share a node per value.
+        self.literals: dict[tuple[type, Any], LiteralNode] = {}
+
+    def peek(self, offset: int = 0) -> Optional[Token]:
+        """Obtains a token ahead of the current token without advancing."""
+        while len(self.lookahead) <= offset:
+            token = next(self.tokens, None)
+            if token is None:
+                return None
+            self.lookahead.append(token)
+        return self.lookahead[offset]
 
     def current_token(self) -> Optional[Token]:
         """Obtains the current token that is being processed."""
-        if self.position < len(self.tokens):
-            return self.tokens[self.position]
-        return None
+        return self.peek()
 
     def advance(self) -> None:
         """Moves the position to the next token."""
-        self.position += 1
+        if self.peek() is not None:
+            self.lookahead.popleft()
 
     def expect(self, token_type: Tokens) -> None:
         """Validates the current token is of the expected type, 
@@ -34,20 +47,20 @@ class Parser:
 
     def parse(self) -> ProgramNode:
         """Parses the entire program and returns the root node of the AST."""
-        statements: list[ASTNode] = []
+        return ProgramNode(list(self.statements()))
 
+    def statements(self) -> Iterator[ASTNode]:
+        """Parses the program one top-level statement at a time, as they are requested."""
         while self.current_token() is not None:
             if self.current_token()[0] == Tokens.IDENTIFIER:
-                statements.append(self.parse_identifier())
+                yield self.parse_identifier()
             elif self.current_token()[0] == Tokens.FUNC:
-                statements.append(self.parse_function_definition())
+                yield self.parse_function_definition()
             elif self.current_token()[0] == Tokens.EOL:
                 self.advance()  # Skip EOL and continue parsing.
             else:
                 raise SyntaxError(f"Unexpected token {self.current_token()}")
 
-        return ProgramNode(statements)
-
     def parse_identifier(self) -> ASTNode:
         """Parses an identifier which could be a variable declaration or a function call."""
         first_statement = self.parse_declaration_or_function_call()
@@ -82,12 +95,12 @@ class Parser:
     def is_declaration(self) -> bool:
         """Checks if the current token sequence represents a variable declaration 
         by looking ahead for a colon."""
-        return (self.position + 1 < len(self.tokens) and
-                self.tokens[self.position + 1][0] == Tokens.COLON)
+        token = self.peek(1)
+        return token is not None and token[0] == Tokens.COLON
 
     def parse_declaration(self) -> DeclarationNode:
         """Parses a series of tokens into a variable declaration including its type and value."""
-        identifier = self.current_token()[1]
+        identifier = sys.intern(self.current_token()[1])
         self.advance()
         self.expect(Tokens.COLON)
         var_type = self.current_token()[1]
@@ -99,7 +112,7 @@ class Parser:
     def parse_function_definition(self) -> FunctionDefNode:
         """Parses a series of tokens into a function definition, including its parameters and body."""
         self.expect(Tokens.FUNC)
-        func_name = self.current_token()[1]
+        func_name = sys.intern(self.current_token()[1])
         self.advance()
         self.expect(Tokens.LPAREN)
         params = self.parse_params()
@@ -114,7 +127,7 @@ class Parser:
         returning a list of tuples containing parameter names and types."""
         params: list[tuple[str, str]] = []
         if self.current_token()[0] != Tokens.RPAREN:
-            param_name = self.current_token()[1]
+            param_name = sys.intern(self.current_token()[1])
             self.advance()
             self.expect(Tokens.COLON)
             param_type = self.current_token()[1]
@@ -122,7 +135,7 @@ class Parser:
             self.advance()
             while self.current_token()[0] == Tokens.COMMA:
                 self.advance()
-                param_name = self.current_token()[1]
+                param_name = sys.intern(self.current_token()[1])
                 self.advance()
                 self.expect(Tokens.COLON)
                 param_type = self.current_token()[1]
@@ -132,7 +145,7 @@ class Parser:
 
     def parse_function_call(self) -> FunctionCallNode:
         """Parses a function call from the tokens, including the function name and its arguments."""
-        func_name = self.current_token()[1]
+        func_name = sys.intern(self.current_token()[1])
         self.advance()
         self.expect(Tokens.LPAREN)
         args = self.parse_args()
@@ -157,7 +170,7 @@ class Parser:
         """Parses a term and handles binary operations like addition and subtraction."""
         node = self.parse_factor()
         while self.current_token() and self.current_token()[0] in (Tokens.PLUS, Tokens.MINUS):
-            operator = self.current_token()
+            operator = self.current_token()[0]
             self.advance()
             right = self.parse_factor()
             node = ExpressionNode(node, operator, right)
@@ -166,10 +179,23 @@ class Parser:
     def parse_factor(self) -> ASTNode:
         """Parses a factor, which can be a number, string, identifier, or a parenthesized expression."""
         token = self.current_token()
-        literals: set[Token] = {Tokens.BOOL, Tokens.NUMBER, Tokens.STRING, Tokens.IDENTIFIER}
+        literals: set[Token] = {Tokens.BOOL, Tokens.NUMBER, Tokens.STRING}
         if token[0] in literals:
             self.advance()
-            return ExpressionNode(token[1])
+            return self.literal(self.parse_literal(token))
+        elif token[0] == Tokens.IDENTIFIER:
+            self.advance()
+            if token[1] in {"true", "false"}:
+                # Booleans are matched as identifiers by the lexer.
+                return self.literal(token[1] == "true")
+            return IdentifierNode(sys.intern(token[1]))
+        elif token[0] == Tokens.MINUS:
+            # Negation, negative numbers such as coordinates become literals.
+            self.advance()
+            operand = self.parse_factor()
+            if isinstance(operand, LiteralNode) and type(operand.value) in (int, float):
+                return self.literal(-operand.value)
+            return ExpressionNode(self.literal(0), Tokens.MINUS, operand)
         elif token[0] == Tokens.LPAREN:
             self.advance()
             node = self.parse_expression()
@@ -178,6 +204,28 @@ class Parser:
         else:
             raise SyntaxError(f"Unexpected token {token}")
 
+    def literal(self, value: Any) -> LiteralNode:
+        """Creates a literal node, reusing the node of an equal number or boolean."""
+        if isinstance(value, str):
+            return LiteralNode(value)
+
+        key = (type(value), value)
+        node = self.literals.get(key)
+        if node is None:
+            node = self.literals[key] = LiteralNode(value)
+        return node
+
+    @staticmethod
+    def parse_literal(token: Token) -> Any:
+        """Converts the text of a literal token into its value."""
+        if token[0] == Tokens.NUMBER:
+            return float(token[1]) if "." in token[1] else int(token[1])
+        elif token[0] == Tokens.BOOL:
+            return token[1] == "true"
+        else:
+            # Remove the surrounding quotes from strings.
+            return token[1][1:-1]
+
     def parse_statements_in_block(self) -> list[ASTNode]:
         """Parses a block of statements such as for functions or if/whiles."""
         statements: list[ASTNode] = []
@@ -0,0 +1,85 @@
+from typing import Any
+from .token import Tokens
+from .node import *
+
+
+# Maps the operator tokens to the text they are written as.
+OPERATOR_TEXT: dict[Tokens, str] = {
+    Tokens.PLUS: "+",
+    Tokens.MINUS: "-",
+    Tokens.MULTIPLY: "*",
+    Tokens.DIVIDE: "/",
+    Tokens.MODULUS: "%",
+    Tokens.EQUAL: "==",
+    Tokens.NOT_EQUAL: "!=",
+    Tokens.GREATER_THAN: ">",
+    Tokens.LESS_THAN: "<",
+    Tokens.GREATER_EQUAL: ">=",
+    Tokens.LESS_EQUAL: "<=",
+}
+
+
+class Printer:
+    """Converts the abstract syntax tree (AST) back into the lines of a script.
+    Comments and the original formatting are not kept.
+    """
+    INDENT: str = "   "
+
+    def print_program(self, node: ProgramNode) -> list[str]:
+        """Converts every statement of the program into lines."""
+        lines: list[str] = []
+        for statement in node.statements:
+            lines.extend(self.print_statement(statement))
+        return lines
+
+    def print_statement(self, node: ASTNode, indent: str = "") -> list[str]:
+        """Converts a statement into its lines, statements on the same frame are joined with `->`."""
+        if isinstance(node, SameFrameNode):
+            lines = self.print_statement(node.statements[0], indent)
+            for statement in node.statements[1:]:
+                lines.append(f"{indent}\t-> {self.print_statement(statement)[0]}")
+            return lines
+        elif isinstance(node, FunctionDefNode):
+            params = ", ".join(f"{name}: {param_type}" for name, param_type in node.params)
+            lines = [f"{indent}func {node.name}({params}) {{"]
+            for statement in node.body:
+                lines.extend(self.print_statement(statement, indent + Printer.INDENT))
+            lines.append(f"{indent}}}")
+            return lines
+        elif isinstance(node, DeclarationNode):
+            return [f"{indent}{node.identifier}: {node.var_type} = {self.print_expression(node.expression)}"]
+        elif isinstance(node, FunctionCallNode):
+            return [f"{indent}{self.print_expression(node)}"]
+        else:
+            raise Exception(f"Unknown statement type: {type(node)}")
+
+    def print_expression(self, node: ASTNode) -> str:
+        """Converts an expression into its text."""
+        if isinstance(node, LiteralNode):
+            return Printer.print_literal(node.value)
+        elif isinstance(node, IdentifierNode):
+            return node.name
+        elif isinstance(node, FunctionCallNode):
+            return f"{node.name}({', '.join(self.print_expression(arg) for arg in node.args)})"
+        elif isinstance(node, ExpressionNode):
+            right = self.print_expression(node.right)
+            if isinstance(node.right, ExpressionNode):
+                # Operations are left associative, the right side keeps its grouping.
+                right = f"({right})"
+            return f"{self.print_expression(node.left)} {OPERATOR_TEXT[node.operator]} {right}"
+        else:
+            raise Exception(f"Unknown expression type: {type(node)}")
+
+    @staticmethod
+    def print_literal(value: Any) -> str:
+        """Converts a literal value into the text it is parsed from."""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        elif isinstance(value, float):
+            # Exponents cannot be parsed, such values are written out in full.
+            text = repr(value)
+            return f"{value:f}" if "e" in text else text
+        elif isinstance(value, str):
+            return f'"{value}"'
+        else:
+            return str(value)
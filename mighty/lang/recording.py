@@ -0,0 +1,188 @@
+from array import array
+from typing import Iterable, Iterator, Optional
+import re
+from .environment import Environment
+from .mouse_controller import MouseButton
+from .backend import Point
+
+# Operations that can be performed by an event of a recording.
+OP_MPOS: int = 0
+OP_CLICK: int = 1
+OP_CLICK_RANDOM: int = 2
+OP_DOWN: int = 3
+OP_UP: int = 4
+OP_SCROLL: int = 5  # The x and y columns are the amounts scrolled.
+OP_MOVE: int = 6  # The argument column is the amount of frames to move over.
+
+# Buttons by the index stored in the argument column.
+BUTTONS: tuple[MouseButton, ...] = tuple(MouseButton)
+_BUTTON_INDEX: dict[str, int] = {button.value: i for i, button in enumerate(BUTTONS)}
+
+# Matches a single line of a recorded script, only literal calls are accepted.
+_EVENT_LINE = re.compile(
+    r'(?P<next>->)?[ \t]*(?:'
+    r'mpos\([ \t]*(?P<x>-?\d+)[ \t]*,[ \t]*(?P<y>-?\d+)[ \t]*\)'
+    r'|mclick\([ \t]*"(?P<click>left|right|middle)"[ \t]*(?:,[ \t]*(?P<random>true|false)[ \t]*)?\)'
+    r'|mdown\([ \t]*"(?P<down>left|right|middle)"[ \t]*\)'
+    r'|mup\([ \t]*"(?P<up>left|right|middle)"[ \t]*\)'
+    r'|mmove\([ \t]*(?P<mx>-?\d+)[ \t]*,[ \t]*(?P<my>-?\d+)[ \t]*,[ \t]*(?P<frames>\d+)[ \t]*\)'
+    r'|mscroll\([ \t]*(?P<dx>-?\d+)[ \t]*,[ \t]*(?P<dy>-?\d+)[ \t]*\)'
+    r'|wait\([ \t]*(?P<wait>\d+)[ \t]*\)'
+    r')[ \t]*'
+)
+
+
+class Recording:
+    """A script made entirely of literal mouse events and waits, such as those written by
+    the recorder. The events are packed into typed columns ordered by the frame they
+    occur on, so they can be played without being lexed, parsed, or compiled.
+    """
+
+    def __init__(self) -> None:
+        self.frames: array = array('I')  # Frame of the event.
+        self.opcodes: array = array('B')
+        self.xs: array = array('i')
+        self.ys: array = array('i')
+        self.args: array = array('I')  # Button of the event, or frames of a movement.
+        self.length: int = 0  # Total amount of frames, including any trailing waits.
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def append(self, frame: int, opcode: int, x: int = 0, y: int = 0, arg: int = 0) -> None:
+        """Adds an event to the end of the recording."""
+        self.frames.append(frame)
+        self.opcodes.append(opcode)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.args.append(arg)
+
+    @staticmethod
+    def parse(lines: Iterable[str]) -> Optional['Recording']:
+        """Packs the lines of a script into a recording, or returns None if any line is
+        not a literal event, in which case the script has to be processed normally.
+        """
+        recording = Recording()
+        frame = -1  # Frame of the statement being processed.
+        wait = 0  # Frames waited by the statement being processed.
+        for line in lines:
+            if not line or line.isspace():
+                continue
+
+            match = _EVENT_LINE.fullmatch(line.strip())
+            if match is None:
+                return None
+
+            if match.group('next') is None:
+                # A new statement begins on the frame after the previous statement and its wait.
+                frame += wait + 1
+                wait = 0
+            elif frame < 0:
+                # The first statement cannot continue a previous frame.
+                return None
+
+            if match.group('x') is not None:
+                recording.append(frame, OP_MPOS, int(match.group('x')), int(match.group('y')))
+            elif match.group('click') is not None:
+                opcode = OP_CLICK_RANDOM if match.group('random') == 'true' else OP_CLICK
+                recording.append(frame, opcode, arg=_BUTTON_INDEX[match.group('click')])
+            elif match.group('down') is not None:
+                recording.append(frame, OP_DOWN, arg=_BUTTON_INDEX[match.group('down')])
+            elif match.group('up') is not None:
+                recording.append(frame, OP_UP, arg=_BUTTON_INDEX[match.group('up')])
+            elif match.group('mx') is not None:
+                recording.append(frame, OP_MOVE, int(match.group('mx')), int(match.group('my')), int(match.group('frames')))
+            elif match.group('dx') is not None:
+                recording.append(frame, OP_SCROLL, int(match.group('dx')), int(match.group('dy')))
+            elif wait == 0:
+                # Matches the `wait` built-in, only the first wait of a frame is kept.
+                wait = int(match.group('wait'))
+
+        recording.length = frame + wait + 1
+        return recording
+
+    def lines(self) -> Iterator[str]:
+        """Converts the recording back into the lines of a script, which parse into the same
+        recording. Events of the same frame are joined with `->`, followed by a wait for
+        the frames without events after them.
+        """
+        count = len(self)
+        if count == 0 or self.frames[0] > 0:
+            # Frames without events before the first event, processed by a wait of their own.
+            first = self.frames[0] if count > 0 else self.length
+            if first > 0:
+                yield f"wait({first - 1})"
+
+        for i in range(count):
+            frame, opcode, x, y, arg = self.frames[i], self.opcodes[i], self.xs[i], self.ys[i], self.args[i]
+            if opcode == OP_MPOS:
+                line = f"mpos({x}, {y})"
+            elif opcode == OP_CLICK or opcode == OP_CLICK_RANDOM:
+                line = f'mclick("{BUTTONS[arg].value}", {"true" if opcode == OP_CLICK_RANDOM else "false"})'
+            elif opcode == OP_DOWN:
+                line = f'mdown("{BUTTONS[arg].value}")'
+            elif opcode == OP_UP:
+                line = f'mup("{BUTTONS[arg].value}")'
+            elif opcode == OP_MOVE:
+                line = f"mmove({x}, {y}, {arg})"
+            elif opcode == OP_SCROLL:
+                line = f"mscroll({x}, {y})"
+            else:
+                raise ValueError(f"Unknown recording opcode: {opcode}")
+            yield line if i == 0 or self.frames[i - 1] != frame else f"\t-> {line}"
+
+            if i + 1 == count or self.frames[i + 1] != frame:
+                next_frame = self.frames[i + 1] if i + 1 < count else self.length
+                if next_frame - frame > 1:
+                    yield f"\t-> wait({next_frame - frame - 1})"
+
+    def start_position(self) -> Optional[Point]:
+        """Obtains the position of the first `mpos` of the first frame, if there is one."""
+        for i in range(len(self)):
+            if self.frames[i] != 0:
+                break
+            if self.opcodes[i] == OP_MPOS:
+                return self.xs[i], self.ys[i]
+        return None
+
+
+class RecordingPlayer:
+    """Plays a recording through the engine. Every frame with events is processed by the
+    same code, which waits until the next frame with events, matching the frames of the
+    script the recording was parsed from.
+    """
+
+    def __init__(self, recording: Recording) -> None:
+        self.recording: Recording = recording
+        self.index: int = 0  # Next event to be processed.
+        self.frame: int = 0  # Next frame to be processed.
+
+    def __iter__(self) -> Iterator['RecordingPlayer']:
+        while self.frame < self.recording.length:
+            yield self
+
+    def __call__(self, env: Environment) -> None:
+        recording, mouse = self.recording, env.mouse
+        frames, opcodes, count = recording.frames, recording.opcodes, len(recording)
+        i = self.index
+        while i < count and frames[i] == self.frame:
+            opcode = opcodes[i]
+            if opcode == OP_MPOS:
+                mouse.move_cursor(recording.xs[i], recording.ys[i])
+            elif opcode == OP_CLICK or opcode == OP_CLICK_RANDOM:
+                mouse.click_button(BUTTONS[recording.args[i]], opcode == OP_CLICK_RANDOM)
+            elif opcode == OP_DOWN:
+                mouse.press_button(BUTTONS[recording.args[i]])
+            elif opcode == OP_UP:
+                mouse.release_button(BUTTONS[recording.args[i]])
+            elif opcode == OP_MOVE:
+                mouse.move_smooth(recording.xs[i], recording.ys[i], recording.args[i])
+            elif opcode == OP_SCROLL:
+                mouse.scroll(recording.xs[i], recording.ys[i])
+            i += 1
+
+        # Wait for the frames without any events, the same as a `wait` would.
+        next_frame = frames[i] if i < count else recording.length
+        env.globals.wait = next_frame - self.frame - 1
+        self.index = i
+        self.frame = next_frame
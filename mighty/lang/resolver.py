@@ -0,0 +1,88 @@
+from typing import Optional
+from .builtins import BUILTINS
+from .node import *
+
+
+class Resolver:
+    """Binds every variable of the abstract syntax tree (AST) to a slot before it is
+    compiled, so that undefined names are reported before the script is played.
+    Statements are resolved in order, a name can only be used once it has been
+    declared by an earlier statement.
+
+    Top-level declarations are stored in the global slots. Within a function, the
+    parameters and declarations are stored in the slots of its local frame, while
+    globals declared before the function definition remain accessible.
+    """
+
+    def __init__(self) -> None:
+        self.globals: dict[str, int] = {}
+        self.functions: dict[str, int] = {}  # Maps the user-defined functions to their amount of parameters.
+        self.locals: Optional[dict[str, int]] = None  # Slots of the function being resolved.
+
+    def resolve(self, node: ASTNode) -> ASTNode:
+        """Resolves a top-level statement, returning it once its names are bound."""
+        if isinstance(node, DeclarationNode):
+            self.resolve_declaration(node)
+        elif isinstance(node, FunctionDefNode):
+            self.resolve_function_definition(node)
+        elif isinstance(node, FunctionCallNode):
+            self.resolve_function_call(node)
+        elif isinstance(node, IdentifierNode):
+            self.resolve_identifier(node)
+        elif isinstance(node, ExpressionNode):
+            self.resolve(node.left)
+            self.resolve(node.right)
+        elif isinstance(node, SameFrameNode):
+            for statement in node.statements:
+                self.resolve(statement)
+        elif not isinstance(node, LiteralNode):
+            raise Exception(f"Unknown node type: {type(node)}")
+        return node
+
+    def resolve_declaration(self, node: DeclarationNode) -> None:
+        """Binds the declared variable to a slot of the current scope, redeclarations reuse the slot."""
+        # The value is resolved first, it cannot refer to the variable being declared.
+        self.resolve(node.expression)
+        scope = self.locals if self.locals is not None else self.globals
+        node.slot = scope.setdefault(node.identifier, len(scope))
+
+    def resolve_function_definition(self, node: FunctionDefNode) -> None:
+        """Resolves the body of the function within its own local scope."""
+        if self.locals is not None:
+            raise SyntaxError(f"Function '{node.name}' cannot be defined within another function.")
+
+        # Defined before the body is resolved, allowing the function to call itself.
+        self.functions[node.name] = len(node.params)
+        self.locals = {}
+        try:
+            for param_name, _ in node.params:
+                self.locals.setdefault(param_name, len(self.locals))
+            for statement in node.body:
+                self.resolve(statement)
+            node.frame_size = len(self.locals)
+        finally:
+            self.locals = None
+
+    def resolve_function_call(self, node: FunctionCallNode) -> None:
+        """Checks that the function exists, and that user-defined functions receive every parameter."""
+        if node.name in self.functions:
+            expected = self.functions[node.name]
+            if len(node.args) != expected:
+                raise TypeError(f"Function '{node.name}' expects {expected} arguments, but {len(node.args)} were given.")
+        elif node.name not in BUILTINS:
+            raise NameError(f"Function '{node.name}' not defined.")
+
+        for arg in node.args:
+            self.resolve(arg)
+
+    def resolve_identifier(self, node: IdentifierNode) -> None:
+        """Binds the variable to the slot of the local scope, then the global scope."""
+        if self.locals is not None and node.name in self.locals:
+            node.slot, node.local = self.locals[node.name], True
+        elif node.name in self.globals:
+            # Global variables are within the local frame of top-level statements.
+            node.slot, node.local = self.globals[node.name], self.locals is None
+        elif node.name in self.functions or node.name in BUILTINS:
+            node.slot, node.local = None, False
+        else:
+            raise NameError(f"Variable or function '{node.name}' not defined.")
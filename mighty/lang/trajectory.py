@@ -0,0 +1,38 @@
+from array import array
+import random
+from .backend import Point
+
+# Maximum amount of pixels each point of a path is jittered by at full randomness.
+JITTER_PX: float = 2.0
+
+
+def trajectory(start: Point, end: Point, frames: int, ease: bool = False, randomness: float = 0.0) -> tuple[array, array]:
+    """Computes every point of a movement ahead of time, one point per frame with the
+    last being the destination. The path is a quadratic Bézier curve that bends and
+    jitters based on the randomness, or a straight line without it.
+    """
+    frames = max(frames, 1)
+    (x0, y0), (x2, y2) = start, end
+    randomness = min(max(randomness, 0.0), 1.0)
+
+    # The control point is offset from the middle of the line, perpendicular to it.
+    offset = random.uniform(-0.5, 0.5) * randomness
+    x1 = (x0 + x2) / 2 - (y2 - y0) * offset
+    y1 = (y0 + y2) / 2 + (x2 - x0) * offset
+
+    steps = [(i + 1) / frames for i in range(frames)]
+    if ease:
+        # Smoothstep, slow at the start and end of the movement.
+        steps = [t * t * (3 - 2 * t) for t in steps]
+
+    xs = array('i', [round((1 - t) ** 2 * x0 + 2 * (1 - t) * t * x1 + t * t * x2) for t in steps])
+    ys = array('i', [round((1 - t) ** 2 * y0 + 2 * (1 - t) * t * y1 + t * t * y2) for t in steps])
+
+    jitter = round(randomness * JITTER_PX)
+    if jitter > 0:
+        # The destination is always exact, only the points leading to it are jittered.
+        for i in range(frames - 1):
+            xs[i] += random.randint(-jitter, jitter)
+            ys[i] += random.randint(-jitter, jitter)
+
+    return xs, ys
@@ -1,78 +1,157 @@
+import queue
+import threading
 import time
-from typing import Optional
-from pynput import mouse
-import pyautogui
-from util import Vec2
-from event import Event, Wait, MousePosition, MouseClick
+from typing import Any, Iterator, Optional
+from util import RingBuffer
+from lang.clock import FrameClock, FrameStats, OverrunPolicy
+from event import EventType, EventLog, events, render
+from simplify import simplify
+from spill import SpillWriter, SpillReader
 
 
 class Recorder:
-    """Records the inputs the user is performing."""
-
-    def __init__(self, interval_ms: int, mouse_randomness: bool) -> None:
+    """Records the inputs the user is performing. Inputs are captured by the listener
+    as they happen, at the native rate of the device, and quantized to the frames
+    of the script once it is saved. Events are spilled to a file as they are logged,
+    so that long recordings use flat memory and survive a crash.
+
+    Capturing is kept apart from everything else: the listener only timestamps what it
+    sees into a queue, the thread calling `next` logs the events, and a writer thread
+    spills and syncs them to the disk, so a slow disk never holds up the other two. The
+    frames that log the events only sleep, and count the deadlines they miss.
+    """
+    # Amount of events the listener can capture between two frames.
+    QUEUE_CAPACITY: int = 65536
+    # Time between writing the logged events to the spill file and syncing it to the disk.
+    FLUSH_INTERVAL_NS: int = 1_000_000_000
+
+    def __init__(self, interval_ms: int, mouse_randomness: bool, spill_filename: str,
+                 simplify_px: float = 0.0) -> None:
         self.interval: int = interval_ms
         self.mouse_randomness: bool = mouse_randomness
-        self.last_mouse_pos: Optional[Vec2] = None
-        self.inactive_frames: int = 0
-        self.actions: list[str] = []
-        self.last_click: Optional[str] = None
-
-        # Start the mouse listener to track clicks.
-        self.listener = mouse.Listener(on_click=self.on_click)
-        self.listener.start()
+        self.simplify_px: float = simplify_px  # Tolerance when simplifying movements, 0 keeps every frame.
+        self.period_ns: int = 1_000_000_000 // max(interval_ms, 1)
+        self.log: EventLog = EventLog()  # Events logged since the last flush.
+
+        # Events are passed from the listener thread to the recording thread as
+        # (timestamp_ns, kind, x, y, button), and logged on every frame.
+        self.queue: RingBuffer = RingBuffer(Recorder.QUEUE_CAPACITY)
+
+        # The first frame begins at the position the mouse is currently in.
+        self.start_ns: int = time.perf_counter_ns()
+        x, y = self.position()
+        self.log.append(self.start_ns, EventType.MPOS, x, y)
+        self.spill: SpillWriter = SpillWriter(spill_filename, self.start_ns, self.period_ns)
+        self.flushed_ns: int = self.start_ns
+
+        # Logs waiting to be spilled by the writer thread, None once there are no more.
+        self.pending: queue.Queue[Optional[EventLog]] = queue.Queue()
+        self.writer = threading.Thread(target=self.run_writer, daemon=True)
+        self.writer.start()
+
+        # Start the mouse listener to track movement, clicks, and scrolling.
+        self.listener = self.listen()
+
+        # Frames are scheduled from the start, skipping any that are missed entirely.
+        self.clock: FrameClock = FrameClock(interval_ms, OverrunPolicy.DROP, spin=False)
+        self.clock.start()
+
+    def position(self) -> tuple[int, int]:
+        """Obtains the current position of the mouse."""
+        # Imported here so the recorder can be driven without a display.
+        import pyautogui
+        return pyautogui.position()
+
+    def listen(self) -> Any:
+        """Starts the listener that captures the inputs of the mouse."""
+        from pynput import mouse
+        listener = mouse.Listener(on_move=self.on_move, on_click=self.on_click, on_scroll=self.on_scroll)
+        listener.start()
+        return listener
+
+    @property
+    def overflows(self) -> int:
+        """Amount of events dropped because the capture queue was full."""
+        return self.queue.overflows
+
+    @property
+    def high_water(self) -> int:
+        """Most events waiting in the capture queue at once."""
+        return self.queue.high_water
+
+    @property
+    def stats(self) -> FrameStats:
+        """Timing accuracy of the frames logging the events, overruns are the frames that missed their deadline."""
+        return self.clock.stats
+
+    def run_writer(self) -> None:
+        """Spills the logs handed over by `flush` and syncs them to the disk, until stopped."""
+        while True:
+            log = self.pending.get()
+            if log is None:
+                return
+            self.spill.write(log)
+            self.spill.sync()
+
+    def on_move(self, x, y):
+        """Handles mouse movement events."""
+        self.queue.push((time.perf_counter_ns(), EventType.MPOS, int(x), int(y), 0))
 
     def on_click(self, x, y, button, pressed):
-        """Handles mouse click events."""
-        if pressed:
-            # Record the button name when pressed.
-            self.last_click = button.name
+        """Handles mouse button press and release events."""
+        if button.name in EventLog.BUTTONS:
+            # The position is queued first so the button changes where it was pressed.
+            now = time.perf_counter_ns()
+            kind = EventType.MDOWN if pressed else EventType.MUP
+            self.queue.push((now, EventType.MPOS, int(x), int(y), 0))
+            self.queue.push((now, kind, 0, 0, EventLog.BUTTONS.index(button.name)))
+
+    def on_scroll(self, x, y, dx, dy):
+        """Handles mouse wheel events."""
+        self.queue.push((time.perf_counter_ns(), EventType.MSCROLL, int(dx), int(dy), 0))
 
     def next(self) -> None:
-        """Processes the next frame, pausing for the maximum of the interval time."""
-        start = time.time()
-
-        events: list[Event] = []
-
-        # Obtain the inputs from the devices.
-        events.extend(self.get_mouse())
-        events.extend(self.get_keyboard())
-
-        if len(events) > 0:
-            if self.inactive_frames > 0:
-                # Register the frames with no activity.
-                self.actions.append(str(Wait(self.inactive_frames)))
-                self.inactive_frames = 0
-
-            # Convert to strings and mark them to execute on the same tick.
-            actions = [str(event) for event in events]
-            self.actions.append(str.join("\n\t-> ", actions))
-        else:
-            self.inactive_frames += 1
-
-        # Calculate elapsed time and the required sleep time in seconds.
-        sleep_time = (1.0 / self.interval) - (time.time() - start)
-
-        if sleep_time > 0.0:
-            time.sleep(sleep_time)
-
+        """Waits for the deadline of the next frame, logging the inputs captured in the meantime."""
+        self.clock.tick()
+        self.drain()
+        now = time.perf_counter_ns()
+        if now - self.flushed_ns >= Recorder.FLUSH_INTERVAL_NS:
+            self.flush()
+            self.flushed_ns = now
         return True
 
-    def get_mouse(self) -> list[Event]:
-        events: list[Event] = []
-
-        # Get the current mouse position.
-        position = Vec2(pyautogui.position())
-        if self.last_mouse_pos is None or self.last_mouse_pos != position:
-            self.last_mouse_pos = position
-            events.append(MousePosition(position))
-
-        # Record mouse clicks if any.
-        if self.last_click is not None:
-            events.append(MouseClick(self.last_click, self.mouse_randomness))
-            self.last_click = None  # Reset click after recording.
-
-        return events
-
-    def get_keyboard(self) -> list[Event]:
-        events: list[Event] = []
-        return events
+    def drain(self) -> None:
+        """Logs every event captured by the listener."""
+        for event in self.queue.drain():
+            self.log.append(*event)
+
+    def flush(self) -> None:
+        """Hands the logged events to the writer thread to be spilled, logging into a new log."""
+        self.pending.put(self.log)
+        self.log = EventLog()
+
+    def stop(self) -> None:
+        """Stops capturing the inputs, spilling any that are left."""
+        self.listener.stop()
+        self.listener.join()
+        self.drain()
+        self.flush()
+        self.pending.put(None)
+        self.writer.join()
+        self.spill.close()
+
+    def render(self) -> Iterator[str]:
+        """Converts the recorded events into the lines of a script, simplifying the movements if enabled."""
+        return Recorder.render_spill(self.spill.filename, self.mouse_randomness, self.simplify_px)
+
+    @staticmethod
+    def render_spill(filename: str, mouse_randomness: bool, simplify_px: float = 0.0) -> Iterator[str]:
+        """Converts the events of a spill file into the lines of a script. Lines are read
+        and produced as they are consumed, unless the movements need to be simplified.
+        """
+        reader = SpillReader(filename)
+        recorded = events(reader.records(), mouse_randomness, reader.period_ns, reader.start_ns)
+        if simplify_px > 0.0:
+            recorded, report = simplify(list(recorded), simplify_px)
+            print(f"Simplified recording: {report}")
+        return render(recorded)
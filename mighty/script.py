@@ -1,4 +1,11 @@
-from typing import Any
+import itertools
+import mmap
+import os
+from typing import Any, Iterable, Iterator, Optional
+from lang.lexer import Lexer
+from lang.parser import Parser
+from lang.optimizer import Optimizer, OptimizerReport
+from lang.printer import Printer
 
 
 class GeneralConfig:
@@ -8,12 +15,16 @@ class GeneralConfig:
         self.version: str = "1.0"
         self.delay: int = 100  # in milliseconds.
         self.fps: int = 100  # Speed to record and playback.
+        self.optimize: bool = False  # Rewrites the code with the optimizer when saved.
+        self.binary: bool = False  # Writes a binary companion of the script when saved.
 
     def from_dict(self, data: dict[str, Any]) -> None:
         """Loads configuration data from a dictionary."""
         self.version = data.get("version", self.version)
         self.delay = data.get("delay", self.delay)
         self.fps = data.get("fps", self.fps)
+        self.optimize = data.get("optimize", self.optimize)
+        self.binary = data.get("binary", self.binary)
 
     def to_dict(self) -> dict[str, Any]:
         """Converts the configuration data to a dictionary."""
@@ -21,6 +32,8 @@ class GeneralConfig:
             "version": self.version,
             "delay": self.delay,
             "fps": self.fps,
+            "optimize": self.optimize,
+            "binary": self.binary,
         }
 
 
@@ -30,17 +43,20 @@ class MouseConfig:
     def __init__(self) -> None:
         self.smooth: bool = True
         self.randomness: float = 0.0
+        self.simplify: float = 0.0  # Pixels recorded movements can stray when simplified, 0 to disable.
 
     def from_dict(self, data: dict[str, Any]) -> None:
         """Loads configuration data from a dictionary."""
         self.smooth = data.get("smooth", self.smooth)
         self.randomness = data.get("randomness", self.randomness)
+        self.simplify = data.get("simplify", self.simplify)
 
     def to_dict(self) -> dict[str, Any]:
         """Converts the configuration data to a dictionary."""
         return {
             "smooth": self.smooth,
             "randomness": self.randomness,
+            "simplify": self.simplify,
         }
 
 
@@ -83,64 +99,132 @@ class ScriptConfig:
         }
 
 
+class ScriptBody:
+    """Lines of the `[script]` section, which is the last section of a file. The lines are
+    read from a memory map of the file as they are iterated, rather than loaded up front,
+    and can be iterated again for as long as the file is unchanged.
+    """
+    BLOCK_SIZE: int = 1 << 20
+
+    def __init__(self, filename: str, offset: int) -> None:
+        self.filename: str = filename
+        self.offset: int = offset  # Byte the first line begins at.
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the lines in the file."""
+        return max(os.path.getsize(self.filename) - self.offset, 0)
+
+    def __iter__(self) -> Iterator[str]:
+        if self.nbytes == 0:
+            # Empty files cannot be mapped.
+            return
+
+        with open(self.filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = self.offset
+            while position < len(data):
+                # Lines are split a block at a time, each block ending on a line break.
+                end = min(position + ScriptBody.BLOCK_SIZE, len(data))
+                if end < len(data):
+                    newline = data.rfind(b"\n", position, end)
+                    if newline < 0:
+                        newline = data.find(b"\n", end)
+                    end = newline + 1 if newline >= 0 else len(data)
+
+                text = data[position:end].decode()
+                lines = text.split("\n")
+                if text.endswith("\n"):
+                    lines.pop()
+                for line in lines:
+                    yield line.rstrip()
+                position = end
+
+
 class Script:
     """Stores configuration and script data."""
+    # Scripts with more code than this, in bytes, are saved without being optimized.
+    OPTIMIZE_BYTES: int = 1 << 20
 
     def __init__(self, filename: str) -> None:
         self.filename: str = filename
         self.config = ScriptConfig()
-        self.code: list[str] = []
+        self._code: Optional[list[str]] = []
+        self.body: Optional[ScriptBody] = None  # Lines in the file, until the code is loaded.
+
+    @property
+    def code(self) -> list[str]:
+        """Lines of the script, read from the file the first time they are needed."""
+        if self._code is None:
+            self._code = list(self.body)
+        return self._code
+
+    @code.setter
+    def code(self, lines: list[str]) -> None:
+        self._code = lines
+
+    @property
+    def loaded(self) -> bool:
+        """Checks if the lines of the script are held in memory."""
+        return self._code is not None
+
+    def lines(self) -> Iterable[str]:
+        """Obtains the lines of the script without loading them if they are still in the file."""
+        return self._code if self._code is not None else self.body
+
+    def code_bytes(self) -> int:
+        """Size of the lines of the script."""
+        if self._code is not None:
+            return sum(len(line) + 1 for line in self._code)
+        return self.body.nbytes
 
     @staticmethod
     def load_script(filename: str) -> 'Script':
-        """Loads the script from file."""
+        """Loads the settings of the script from file. Only the sections before `[script]`
+        are parsed, the code is read from the file once it is needed.
+        """
         script = Script(filename)
-        with open(filename, 'r') as file:
-            lines = file.readlines()
-
         current_section = None
-        script_lines = []
         settings = {"general": {}, "mouse": {}, "keyboard": {}}
 
-        for line in lines:
-            line = line.rstrip()
+        with open(filename, 'rb') as file:
+            for line in iter(file.readline, b""):
+                line = line.decode().strip()
 
-            # Skip empty lines and comments.
-            if current_section != "script":
-                line = line.lstrip()
+                # Skip empty lines and comments.
                 if not line or line.startswith("#"):
                     continue
 
-            # Check for section headers.
-            if line.startswith("[") and line.endswith("]"):
-                current_section = line[1:-1].lower()
-                continue
-
-            if current_section == "general-settings":
-                # Parse settings in the form of key = value.
-                key, value = map(str.strip, line.split("=", 1))
-                value = Script._convert_value(value)
-                settings["general"][key] = value
-
-            elif current_section == "mouse-settings":
-                # Parse settings in the form of key = value.
-                key, value = map(str.strip, line.split("=", 1))
-                value = Script._convert_value(value)
-                settings["mouse"][key] = value
-
-            elif current_section == "keyboard-settings":
-                # Parse settings in the form of key = value.
-                key, value = map(str.strip, line.split("=", 1))
-                value = Script._convert_value(value)
-                settings["keyboard"][key] = value
-
-            elif current_section == "script":
-                # Append script lines.
-                script_lines.append(line)
-
-        # Load settings and code into the script.
+                # Check for section headers, the code begins after the script section.
+                if line.startswith("[") and line.endswith("]"):
+                    current_section = line[1:-1].lower()
+                    if current_section == "script":
+                        break
+                    continue
+
+                if current_section == "general-settings":
+                    # Parse settings in the form of key = value.
+                    key, value = map(str.strip, line.split("=", 1))
+                    value = Script._convert_value(value)
+                    settings["general"][key] = value
+
+                elif current_section == "mouse-settings":
+                    # Parse settings in the form of key = value.
+                    key, value = map(str.strip, line.split("=", 1))
+                    value = Script._convert_value(value)
+                    settings["mouse"][key] = value
+
+                elif current_section == "keyboard-settings":
+                    # Parse settings in the form of key = value.
+                    key, value = map(str.strip, line.split("=", 1))
+                    value = Script._convert_value(value)
+                    settings["keyboard"][key] = value
+
+            offset = file.tell()
+
+        # Load settings into the script, the code is left in the file.
         script.config.from_dict(settings)
-        script.code = script_lines
+        script._code = None
+        script.body = ScriptBody(filename, offset)
 
         return script
 
@@ -156,9 +240,54 @@ class Script:
         else:
             return value.strip('"').strip("'")
 
-    def save_script(self) -> None:
-        """Saves the script to a custom format file."""
-        with open(self.filename, 'w') as file:
+    def optimize(self) -> Optional[OptimizerReport]:
+        """Rewrites the code with the optimizer, leaving it unchanged if it cannot be parsed.
+        Comments and formatting are not kept.
+        """
+        try:
+            program = Parser(Lexer(self.parse_script()).tokenize()).parse()
+        except Exception as e:
+            print(f"Unable to optimize the script: {e}")
+            return None
+
+        optimizer = Optimizer()
+        self.code = Printer().print_program(optimizer.optimize(program))
+        return optimizer.report
+
+    def save_script(self, code: Optional[Iterable[str]] = None) -> None:
+        """Saves the script to a custom format file. The code can be given as lines that are
+        written as they are produced instead of the code of the script. The file is written
+        under a temporary name and renamed over the script, so it is never left half written.
+        """
+        optimize = self.config.general.optimize
+        if code is not None and optimize:
+            # The optimizer needs the entire program, which is only held if it is small enough.
+            code = iter(code)
+            held, size = [], 0
+            for line in code:
+                held.append(line)
+                size += len(line) + 1
+                if size > Script.OPTIMIZE_BYTES:
+                    break
+            if size > Script.OPTIMIZE_BYTES:
+                code = itertools.chain(held, code)
+                optimize = False
+            else:
+                self.code = held
+                code = None
+        elif code is None and optimize:
+            optimize = self.code_bytes() <= Script.OPTIMIZE_BYTES
+
+        if code is None:
+            if optimize:
+                report = self.optimize()
+                if report is not None:
+                    print(f"Optimized script: {report}")
+            # Code that was never loaded is copied over from the file.
+            code = self.lines()
+
+        temporary = f"{self.filename}.tmp"
+        with open(temporary, 'w', newline="\n") as file:
             # Write the general settings section.
             file.write("[general-settings]\n")
             for key, value in self.config.general.to_dict().items():
@@ -176,16 +305,27 @@ class Script:
 
             # Write the script section.
             file.write("\n[script]\n")
-            for line in self.code:
+            file.flush()
+            offset = file.buffer.tell()
+            for line in code:
                 file.write(f"{line}\n")
 
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.filename)
+
+        if code is not self._code:
+            # Lines that were not held in memory are read from the new file once needed.
+            self._code = None
+        self.body = ScriptBody(self.filename, offset)
+
     def add_line(self, line: str) -> None:
         """Adds a line to the script code."""
         self.code.append(line)
 
     def parse_script(self) -> list[str]:
         """Parses the script lines to be processed by the interpreter."""
-        return [line.strip() for line in self.code if line.strip()]
+        return [line.strip() for line in self.lines() if line.strip()]
 
     @staticmethod
     def create_default(filename: str) -> 'Script':
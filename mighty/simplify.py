@@ -0,0 +1,116 @@
+import math
+from typing import Optional
+from util import Vec2
+from event import Event, MousePosition, MouseMove, render
+from lang.trajectory import trajectory
+
+
+class SimplifyReport:
+    """Outcome of simplifying the movements of a recording."""
+
+    def __init__(self, lines_before: int, lines_after: int, max_deviation: float) -> None:
+        self.lines_before: int = lines_before
+        self.lines_after: int = lines_after
+        self.max_deviation: float = max_deviation  # Furthest a frame strays from the recording, in pixels.
+
+    @property
+    def compression(self) -> float:
+        """Amount of lines in the recording for every line once simplified."""
+        return self.lines_before / self.lines_after if self.lines_after > 0 else 1.0
+
+    def __str__(self) -> str:
+        return (f"lines={self.lines_before}->{self.lines_after} compression={self.compression:.2f}x "
+                f"max_deviation={self.max_deviation:.2f}px")
+
+
+def _deviation(points: list[Vec2], i: int, j: int) -> tuple[float, int]:
+    """Furthest the points between i and j are from the movement that replaces them,
+    as (pixels, index). The movement is computed the same way `mmove` performs it.
+    """
+    xs, ys = trajectory((points[i].x, points[i].y), (points[j].x, points[j].y), j - i)
+    deviation, furthest = 0.0, i
+    for k in range(i + 1, j):
+        distance = math.hypot(xs[k - i - 1] - points[k].x, ys[k - i - 1] - points[k].y)
+        if distance > deviation:
+            deviation, furthest = distance, k
+    return deviation, furthest
+
+
+def _segments(points: list[Vec2], tolerance: float) -> tuple[list[int], float]:
+    """Ramer-Douglas-Peucker over the points of consecutive frames, measuring the distance
+    to where the movement is on the same frame. Returns the indices of the points kept
+    and the largest deviation of the segments between them.
+    """
+    kept = {0, len(points) - 1}
+    deviations: list[float] = [0.0]
+    stack = [(0, len(points) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+
+        deviation, k = _deviation(points, i, j)
+        if deviation > tolerance:
+            kept.add(k)
+            stack.append((i, k))
+            stack.append((k, j))
+        else:
+            deviations.append(deviation)
+
+    return sorted(kept), max(deviations)
+
+
+def simplify(events: list[tuple[int, Event]], tolerance: float) -> tuple[list[tuple[int, Event]], SimplifyReport]:
+    """Folds runs of positions on consecutive frames into timed `mmove` segments, as long
+    as no frame strays further than the tolerance in pixels. The events are (frame, event)
+    in order of their frame, every event keeps the frame it happens on.
+    """
+    simplified: list[tuple[int, Event]] = []
+    position: Optional[Vec2] = None  # Cursor position before the run.
+    run: list[tuple[int, Vec2]] = []  # Positions of consecutive frames, as (frame, position).
+    max_deviation = 0.0
+
+    def fold() -> None:
+        nonlocal position, max_deviation
+        if not run:
+            return
+
+        # The run begins from wherever the cursor was.
+        points = [position] + [point for _, point in run]
+        kept, deviation = _segments(points, tolerance)
+        max_deviation = max(max_deviation, deviation)
+        for i, j in zip(kept, kept[1:]):
+            # The movement starts on the frame after the previous point.
+            frame = run[i][0]
+            if j - i == 1:
+                simplified.append((frame, MousePosition(points[j])))
+            else:
+                simplified.append((frame, MouseMove(points[j], j - i)))
+
+        position = points[-1]
+        run.clear()
+
+    # Only frames with a single position can become part of a movement.
+    frames: list[tuple[int, list[Event]]] = []
+    for frame, event in events:
+        if frames and frames[-1][0] == frame:
+            frames[-1][1].append(event)
+        else:
+            frames.append((frame, [event]))
+
+    for frame, group in frames:
+        if len(group) == 1 and isinstance(group[0], MousePosition) and position is not None:
+            if run and run[-1][0] != frame - 1:
+                fold()
+            run.append((frame, group[0].position))
+            continue
+
+        fold()
+        for event in group:
+            simplified.append((frame, event))
+            if isinstance(event, MousePosition):
+                position = event.position
+    fold()
+
+    report = SimplifyReport(sum(1 for _ in render(events)), sum(1 for _ in render(simplified)), max_deviation)
+    return simplified, report
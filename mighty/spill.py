@@ -0,0 +1,90 @@
+import os
+import struct
+from typing import BinaryIO, Iterator
+from event import EventLog, Record
+
+
+class SpillWriter:
+    """Appends the events of a recording to a file while it is captured, so memory stays
+    flat and a crash loses at most the events since the last sync. The file begins with
+    a header, followed by chunks holding the columns of an event log. An existing file is
+    never replaced, as it holds a recording that was not saved.
+    """
+    MAGIC: bytes = b"MX3R"
+    HEADER: struct.Struct = struct.Struct("<4sqq")  # Magic, start_ns, period_ns.
+    CHUNK: struct.Struct = struct.Struct("<I")  # Amount of events in the chunk.
+    BUFFER_SIZE: int = 1 << 16
+
+    def __init__(self, filename: str, start_ns: int, period_ns: int) -> None:
+        self.filename: str = filename
+        self.events: int = 0  # Amount of events written.
+        self.file: BinaryIO = open(filename, 'xb', buffering=SpillWriter.BUFFER_SIZE)
+        self.file.write(SpillWriter.HEADER.pack(SpillWriter.MAGIC, start_ns, period_ns))
+        self.sync()
+
+    def write(self, log: EventLog) -> None:
+        """Appends the events of the log as a chunk, and clears the log."""
+        if len(log) == 0:
+            return
+
+        self.file.write(SpillWriter.CHUNK.pack(len(log)))
+        for column in (log.timestamps, log.kinds, log.xs, log.ys, log.buttons):
+            self.file.write(column.tobytes())
+        self.events += len(log)
+        log.clear()
+
+    def sync(self) -> None:
+        """Forces the chunks written so far onto the disk."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        """Syncs and closes the file."""
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+
+
+class SpillReader:
+    """Reads back the events of a file written by the spill writer, one chunk at a time.
+    A chunk cut short by a crash is ignored along with everything after it.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename: str = filename
+        with open(filename, 'rb') as file:
+            header = file.read(SpillWriter.HEADER.size)
+        if len(header) < SpillWriter.HEADER.size:
+            raise ValueError(f"Recording spill file is incomplete: {filename}")
+
+        magic, self.start_ns, self.period_ns = SpillWriter.HEADER.unpack(header)
+        if magic != SpillWriter.MAGIC:
+            raise ValueError(f"Not a recording spill file: {filename}")
+
+    def chunks(self) -> Iterator[EventLog]:
+        """Iterates over the chunks of the file as event logs."""
+        with open(self.filename, 'rb') as file:
+            file.seek(SpillWriter.HEADER.size)
+            while True:
+                data = file.read(SpillWriter.CHUNK.size)
+                if len(data) < SpillWriter.CHUNK.size:
+                    return
+                count, = SpillWriter.CHUNK.unpack(data)
+
+                log = EventLog()
+                for column in (log.timestamps, log.kinds, log.xs, log.ys, log.buttons):
+                    data = file.read(count * column.itemsize)
+                    if len(data) < count * column.itemsize:
+                        return
+                    column.frombytes(data)
+                yield log
+
+    def records(self) -> Iterator[Record]:
+        """Iterates over every event of the file in order of time, as records."""
+        for log in self.chunks():
+            yield from log.records()
+
+
+def spill_filename(filename: str) -> str:
+    """Name of the file a recording into the script is spilled to."""
+    return f"{filename}.rec"
@@ -1,13 +1,16 @@
 import os
 import re
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import Qt
-from script import Script
+from PyQt5.QtCore import Qt, pyqtSignal
+from script import Script, ScriptConfig
+from catalog import ScriptCatalog
 from .script_controller import ScriptController
 
 
 class GeneralTab(QWidget):
     """This tab is used to select scripts and modify their configurations."""
+    # Emitted from the catalog's thread when scripts are added, changed, or removed.
+    catalog_changed = pyqtSignal()
 
     def __init__(self, main_window: 'MainWindow', parent=None) -> None:
         super().__init__(parent)
@@ -19,8 +22,13 @@ class GeneralTab(QWidget):
         self.init_settings_section()
         self.setLayout(self.main_layout)
 
-        # Populate the script list with .mx3 files.
+        # Populate the script list with .mx3 files from the catalog, updating it as they change.
+        # Scripts are listed right away, their entries are filled in as they are indexed.
+        self.catalog = ScriptCatalog(os.getcwd())
+        self.catalog.scan()
+        self.catalog_changed.connect(self.populate_script_list)
         self.populate_script_list()
+        self.catalog.start(self.catalog_changed.emit)
 
     @property
     def script_controller(self) -> ScriptController:
@@ -99,6 +107,14 @@ class GeneralTab(QWidget):
         self.general_fps.setSingleStep(100)
         layout.addRow(QLabel("FPS:", self), self.general_fps)
 
+        # Checkbox to rewrite the script with the optimizer when it is saved, scripts over 1 MiB are skipped.
+        self.general_optimize = QCheckBox()
+        layout.addRow(QLabel("Optimize on Save (up to 1 MiB):", self), self.general_optimize)
+
+        # Checkbox to write a binary companion of the script when it is saved.
+        self.general_binary = QCheckBox()
+        layout.addRow(QLabel("Binary Copy on Save:", self), self.general_binary)
+
         layout.setFormAlignment(Qt.AlignLeft | Qt.AlignTop)
         layout.setLabelAlignment(Qt.AlignLeft)
 
@@ -123,6 +139,14 @@ class GeneralTab(QWidget):
         self.mouse_randomness.setDisabled(False)
         layout.addRow(QLabel("Randomness:", self), self.mouse_randomness)
 
+        # Tolerance in pixels when simplifying recorded movements, 0 records every frame.
+        self.mouse_simplify = QDoubleSpinBox()
+        self.mouse_simplify.setRange(0.00, 100.00)
+        self.mouse_simplify.setDecimals(2)
+        self.mouse_simplify.setSingleStep(0.5)
+        self.mouse_simplify.setDisabled(False)
+        layout.addRow(QLabel("Simplify (px):", self), self.mouse_simplify)
+
         layout.setFormAlignment(Qt.AlignLeft | Qt.AlignTop)
         layout.setLabelAlignment(Qt.AlignLeft)
 
@@ -144,17 +168,26 @@ class GeneralTab(QWidget):
         return group_box
 
     def populate_script_list(self) -> None:
-        """Populate the script list with .mx3 files found in the current directory."""
-        self.script_list.clear()
-        script_directory = os.getcwd()
+        """Populate the script list with the .mx3 files in the catalog, keeping the selected script."""
+        current_item = self.script_list.currentItem()
+        selected = current_item.text() if current_item else None
+        names = self.catalog.names()
 
-        for filename in os.listdir(script_directory):
-            if filename.endswith(".mx3"):
-                self.script_list.addItem(filename)
+        # The selection is restored without being loaded again.
+        self.script_list.blockSignals(True)
+        self.script_list.clear()
+        for filename in names:
+            self.script_list.addItem(filename)
+        if selected in names:
+            self.script_list.setCurrentRow(names.index(selected))
+        self.script_list.blockSignals(False)
 
         # Auto-select and highlight the first item if any scripts exist.
-        if self.script_list.count() > 0:
-            self.script_list.setCurrentRow(0)
+        if selected not in names:
+            if self.script_list.count() > 0:
+                self.script_list.setCurrentRow(0)
+            else:
+                self.load_script_settings(None)
 
     def load_script_settings(self, current_item) -> None:
         """Load the selected script's settings into the UI."""
@@ -166,34 +199,52 @@ class GeneralTab(QWidget):
         script_name = current_item.text()
         self.script_controller.load_script(script_name)
 
-        config = self.script_controller.config()
+        # Settings are read from the catalog, unless the script changed since it was indexed.
+        entry = self.catalog.entry(script_name)
+        try:
+            stat = os.stat(script_name)
+        except OSError:
+            stat = None
+        if entry is not None and stat is not None and (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            config = ScriptConfig()
+            config.from_dict(entry.settings)
+        else:
+            config = self.script_controller.config()
+
         # Populate the General, Mouse, and Keyboard sections using script properties.
         self.general_delay.setValue(config.general.delay)
         self.general_fps.setValue(config.general.fps)
+        self.general_optimize.setChecked(config.general.optimize)
+        self.general_binary.setChecked(config.general.binary)
         self.mouse_smooth.setChecked(config.mouse.smooth)
         self.mouse_randomness.setValue(config.mouse.randomness)
+        self.mouse_simplify.setValue(config.mouse.simplify)
 
         self.save_button.setDisabled(False)
         self.delete_button.setDisabled(False)
 
     def save_script(self) -> None:
         """Save the current settings back into the selected script."""
-        if not self.script_controller._script:
+        if self.script_controller.filename is None:
             return
 
         script = self.script_controller.script()
         # Update the script object with the current UI settings.
         script.config.general.delay = self.general_delay.value()
         script.config.general.fps = self.general_fps.value()
+        script.config.general.optimize = self.general_optimize.isChecked()
+        script.config.general.binary = self.general_binary.isChecked()
         script.config.mouse.smooth = self.mouse_smooth.isChecked()
         script.config.mouse.randomness = self.mouse_randomness.value()
+        script.config.mouse.simplify = self.mouse_simplify.value()
 
         # Save the script.
-        script.save_script()
+        self.script_controller.save_script()
+        self.catalog.poll_now()
 
     def delete_script(self) -> None:
         """Delete the selected script after confirmation."""
-        if not self.script_controller._script:
+        if self.script_controller.filename is None:
             return
 
         reply = QMessageBox.question(self, "Delete Script",
@@ -207,6 +258,7 @@ class GeneralTab(QWidget):
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Failed to delete the script: {e}")
                 return
+            self.catalog.poll_now()
 
             current_item = self.script_list.currentItem()
             if current_item:
@@ -226,8 +278,11 @@ class GeneralTab(QWidget):
         """Clear the settings display after deleting a script."""
         self.general_delay.setValue(0)
         self.general_fps.setValue(0)
+        self.general_optimize.setChecked(False)
+        self.general_binary.setChecked(False)
         self.mouse_smooth.setChecked(False)
         self.mouse_randomness.setValue(0.000)
+        self.mouse_simplify.setValue(0.00)
         self.keyboard_placeholder.setText("No keyboard settings yet.")
         self.save_button.setDisabled(True)
         self.delete_button.setDisabled(True)
@@ -255,6 +310,7 @@ class GeneralTab(QWidget):
 
             self.script_list.addItem(script_filename)
             self.script_list.setCurrentItem(self.script_list.findItems(script_filename, Qt.MatchExactly)[0])
+            self.catalog.poll_now()
 
     def is_valid_filename(self, filename) -> None:
         """Check if the filename is valid (no special characters, etc.)."""
@@ -6,10 +6,17 @@ import pyautogui
 from script import Script, ScriptConfig
 from lang import Engine
 from lang.params import EngineParameters
+from lang.cache import ProgramCache
+from lang.recording import Recording
 from record import Recorder
+from spill import spill_filename
+from binary import BinaryScript, binary_filename
 
 
 class ScriptController:
+    # Scripts with more code than this, in bytes, are parsed as they are played.
+    STREAMING_BYTES: int = 1 << 20
+
     def __init__(self, filename: Optional[str] = None) -> None:
         self.filename = filename
         self._script: Optional[Script] = None
@@ -25,9 +32,11 @@ class ScriptController:
         signal.signal(signal.SIGINT, self.stop_script)
 
     def script(self) -> Script:
-        """Obtains the current script being controlled."""
-        if self.script is None:
-            raise Exception("Unable to load script configuration from controller, script is unset.")
+        """Obtains the current script being controlled, loading it the first time it is needed."""
+        if self._script is None:
+            if self.filename is None:
+                raise Exception("Unable to load script configuration from controller, script is unset.")
+            self.reset_script()
         return self._script
 
     def code(self) -> list[str]:
@@ -39,24 +48,75 @@ class ScriptController:
         return self.script().config
 
     def load_script(self, filename: str) -> None:
-        """Sets the script to be controlled."""
+        """Sets the script to be controlled, which is loaded once it is needed."""
         self.filename = filename
-        self.reset_script()
+        self._script = None
 
     def save_script(self) -> None:
         """Commits the current settings to the saved file."""
-        self._script.code = self.code()
-        self._script.save_script()
+        self.script().save_script()
+        ScriptController.save_binary(self.script())
+
+    @staticmethod
+    def save_binary(script: Script) -> None:
+        """Writes the binary companion of the script if enabled, otherwise removes any stale one."""
+        filename = binary_filename(script.filename)
+        if script.config.general.binary:
+            BinaryScript.from_script(script).save(filename)
+        elif os.path.exists(filename):
+            os.remove(filename)
+
+    def load_binary(self) -> Optional[BinaryScript]:
+        """Loads the binary companion of the script, if there is one that was made from the script as it is now."""
+        filename = binary_filename(self.filename)
+        if not os.path.exists(filename):
+            return None
+        try:
+            binary = BinaryScript.load(filename)
+        except (OSError, ValueError) as e:
+            print(f"Unable to load the binary copy of the script: {e}")
+            return None
+
+        if not binary.made_from(self.filename):
+            binary.close()
+            return None
+        return binary
 
     def delete_script(self) -> None:
         """Deletes the script from existence."""
-        if self._script is not None:
-            os.remove(self._script.filename)
+        if self.filename is not None:
+            os.remove(self.filename)
+            if os.path.exists(binary_filename(self.filename)):
+                os.remove(binary_filename(self.filename))
+            self._script = None
 
     def reset_script(self) -> None:
-        """Loads the script from file resetting the settings."""
+        """Loads the script from file resetting the settings, recovering an interrupted recording first.
+        Nothing is recovered from another thread while a recording may still be writing to its spill file.
+        """
+        elsewhere = self.thread is not None and self.thread.is_alive() and self.thread is not threading.current_thread()
+        if not elsewhere and os.path.exists(spill_filename(self.filename)):
+            self.recover_recording()
         self._script = Script.load_script(self.filename)
-        self._code = self._script.code
+
+    def recover_recording(self) -> None:
+        """Saves the events of a recording that never finished, such as one interrupted by a crash."""
+        script = Script.load_script(self.filename)
+        try:
+            self.save_recording(script)
+            print(f"Recovered an interrupted recording into: {self.filename}")
+        except Exception as e:
+            print(f"Unable to recover the interrupted recording: {e}")
+
+    @staticmethod
+    def save_recording(script: Script, spill: Optional[str] = None) -> None:
+        """Replaces the code of the script with its recording, removing the spill file once saved."""
+        if spill is None:
+            spill = spill_filename(script.filename)
+        config = script.config
+        script.save_script(Recorder.render_spill(spill, config.mouse.randomness > 0.0, config.mouse.simplify))
+        os.remove(spill)
+        ScriptController.save_binary(script)
 
     def set_stop_callback(self, call: Callable) -> None:
         """Sets the callback that will be used when script execution is halted."""
@@ -101,33 +161,82 @@ class ScriptController:
         """Method to run a simple loop in a separate thread, simulating playback."""
         screen_size = pyautogui.size()
         config = self.config()
-        params = EngineParameters(config.general.fps, screen_size, config.mouse.randomness)
-        engine = Engine(self.code(), params)
+        # The code is streamed from the file unless it has been loaded.
+        code = self.script().lines()
+        streaming = self.script().code_bytes() > ScriptController.STREAMING_BYTES
+        params = EngineParameters(config.general.fps, screen_size, config.mouse.randomness,
+                                  smooth=config.mouse.smooth, streaming=streaming)
+        engine: Optional[Engine] = None
+        binary: Optional[BinaryScript] = None
 
         try:
+            binary = self.load_binary()
+            # Recordings are played straight from their binary copy when it is up to date.
+            recording = binary.recording if binary is not None else None
+            if recording is None and not streaming:
+                # Packing reads the entire script, long scripts are left to be streamed instead.
+                recording = Recording.parse(code)
+            # Undefined names and functions are reported while the engine is created.
+            if recording is not None:
+                # Recorded scripts are played from their events, without being parsed.
+                engine = Engine(recording, params, self.stop_event)
+            elif streaming:
+                engine = Engine(code, params, self.stop_event)
+            else:
+                # Unchanged scripts are loaded from the cache instead of parsed again.
+                engine = Engine(ProgramCache().load(self.filename, code), params, self.stop_event)
+
             while not self.stop_event.is_set() and engine.next():
                 pass
         except Exception as e:
-            print(f"Error during playback: {e}")
+            # Errors before the engine exists, such as undefined names, are compile errors.
+            print(f"Error during {'playback' if engine is not None else 'compilation'}: {e}")
         finally:
+            if engine is not None:
+                engine.stop()
+            if binary is not None:
+                # Unmaps the file, so that it can be replaced when the script is saved.
+                binary.close()
             self.stop_event.set()
             self.stop_callback()
             self.stop_callback = None
 
     def run_record(self) -> None:
         """Method to run a simple loop in a separate thread, simulating recording."""
-        config = self.config()
-        recorder: Recorder = Recorder(config.general.fps, config.mouse.randomness > 0.0)
+        # Saved into the script selected now, even if another is selected while recording.
+        filename = self.filename
+        if os.path.exists(spill_filename(filename)):
+            # A recording left by a crash is saved before a new one is spilled in its place.
+            self.recover_recording()
+            self._script = Script.load_script(filename)
+        recorder: Optional[Recorder] = None
 
         try:
+            config = self.config()
+            recorder = Recorder(config.general.fps, config.mouse.randomness > 0.0,
+                                spill_filename(filename), config.mouse.simplify)
             while not self.stop_event.is_set():
                 recorder.next()
         except Exception as e:
             print(f"Error during recording: {e}")
         finally:
             self.stop_event.set()
-            self._script.code = recorder.actions
-            self.script().save_script()
-            self.reset_script()
+            if recorder is not None:
+                self.finish_recording(recorder, filename)
             self.stop_callback()
             self.stop_callback = None
+
+    def finish_recording(self, recorder: Recorder, filename: str) -> None:
+        """Stops the recorder and saves its recording into the script it was started for."""
+        recorder.stop()
+        if recorder.overflows > 0:
+            print(f"Dropped {recorder.overflows} events during recording, the capture queue was full.")
+        if recorder.stats.overruns > 0:
+            print(f"Missed the deadline of {recorder.stats.overruns} frames during recording: "
+                  f"{recorder.stats} high_water={recorder.high_water}")
+        try:
+            ScriptController.save_recording(Script.load_script(filename), recorder.spill.filename)
+        except Exception as e:
+            print(f"Unable to save the recording, it is recovered once the script is loaded: {e}")
+        if self.filename == filename:
+            self._script = None
@@ -35,3 +35,50 @@ class Vec2:
         if isinstance(other, Vec2):
             return (self.x, self.y) >= (other.x, other.y)
         return NotImplemented
+
+
+class RingBuffer:
+    """Bounded queue between a single producer thread and a single consumer thread.
+    Neither side takes a lock, each index is only ever written by one of the threads.
+    Items pushed while the buffer is full are dropped and counted as overflows.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity: int = capacity
+        self.slots: list = [None] * capacity
+        self.head: int = 0  # Total items pushed, written by the producer.
+        self.tail: int = 0  # Total items drained, written by the consumer.
+        self.overflows: int = 0  # Items dropped because the buffer was full.
+        self.high_water: int = 0  # Most items held by the buffer at once.
+
+    def __len__(self) -> int:
+        return self.head - self.tail
+
+    def push(self, item) -> bool:
+        """Adds an item from the producer, returns False if it was dropped."""
+        size = self.head - self.tail
+        if size >= self.capacity:
+            self.overflows += 1
+            return False
+
+        self.slots[self.head % self.capacity] = item
+        # Only published to the consumer once the slot has been written.
+        self.head += 1
+        if size + 1 > self.high_water:
+            self.high_water = size + 1
+        return True
+
+    def drain(self) -> list:
+        """Removes every item that has been pushed so far, in order, for the consumer."""
+        head, tail = self.head, self.tail
+        start, end = tail % self.capacity, head % self.capacity
+        if head == tail:
+            return []
+        elif start < end:
+            items = self.slots[start:end]
+        else:
+            items = self.slots[start:] + self.slots[:end]
+
+        # The slots can be reused by the producer once the tail has moved past them.
+        self.tail = head
+        return items